@@ -0,0 +1,46 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Select whole text and report cost and undo steps of comment, uncomment, indent and dedent.
+
+usage: python bench_block_edit.py [n_lines]
+"""
+
+import sys
+import time
+
+from openalea.vpltk.qt import QtGui
+from openalea.oalab.editor.text_editor import TextEditor
+
+
+def bench(n=5000):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+    editor = TextEditor()
+    for nline in (n / 10, n, n * 10):
+        editor.set_text('\n'.join('    x_%d = f(x_%d)' % (i, i - 1) for i in range(nline)))
+        doc = editor.document()
+        for action in ('comment', 'uncomment', 'indent', 'dedent'):
+            editor.selectAll()
+            undo_steps = doc.availableUndoSteps()
+            t0 = time.time()
+            getattr(editor, action)()
+            t = time.time() - t0
+            print '%6d lines, %-9s: %7.1f ms, %d undo step(s)' % (
+                nline, action, 1000 * t, doc.availableUndoSteps() - undo_steps)
+        app.processEvents()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:2]]
+    bench(*args)
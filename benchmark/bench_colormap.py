@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Compare scalar Colormap.get_color with batch Colormap.get_colors.
+
+usage: python bench_colormap.py [n_values]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from openalea.oalab.colormap.colormap_utils import Colormap
+
+
+def jet():
+    colormap = Colormap(name='jet')
+    colormap.add_rgb_point(0.0, (0, 0, 143))
+    colormap.add_rgb_point(0.125, (0, 0, 255))
+    colormap.add_rgb_point(0.375, (0, 255, 255))
+    colormap.add_rgb_point(0.625, (255, 255, 0))
+    colormap.add_rgb_point(0.875, (255, 0, 0))
+    colormap.add_rgb_point(1.0, (128, 0, 0))
+    return colormap
+
+
+def bench(n=1000000):
+    colormap = jet()
+    values = np.random.rand(n)
+
+    t0 = time.time()
+    for value in values:
+        colormap.get_color(value)
+    t_scalar = time.time() - t0
+    print 'get_color (scalar):      %8.3f s' % t_scalar
+
+    t0 = time.time()
+    colormap.get_colors(values)
+    t_batch = time.time() - t0
+    print 'get_colors:              %8.3f s (x%.0f)' % (t_batch, t_scalar / t_batch)
+
+    colormap.lut(1024)
+    t0 = time.time()
+    colormap.get_colors(values, lut_resolution=1024)
+    t_lut = time.time() - t0
+    print 'get_colors (lut 1024):   %8.3f s (x%.0f)' % (t_lut, t_scalar / t_lut)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        bench(int(sys.argv[1]))
+    else:
+        bench()
@@ -0,0 +1,56 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Fill completion index with a large namespace and report update and prefix lookup costs.
+
+usage: python bench_completion.py [n_identifiers] [n_changes]
+"""
+
+import random
+import string
+import sys
+import time
+
+from openalea.oalab.editor.completion import CompletionIndex
+
+
+def identifiers(n):
+    chars = string.ascii_letters + '_'
+    return set(''.join(random.choice(chars) for i in range(random.randint(3, 15))) for j in xrange(n))
+
+
+def bench(n=100000, nchange=100, nlookup=10000):
+    random.seed(0)
+    names = list(identifiers(n))
+    index = CompletionIndex()
+
+    t0 = time.time()
+    index.update_namespace(names)
+    print 'initial fill: %.3f s for %d identifiers' % (time.time() - t0, len(index))
+
+    changed = names[nchange:] + ['new_name_%d' % i for i in range(nchange)]
+    t0 = time.time()
+    index.update_namespace(changed)
+    print 'update (%d added, %d removed): %.3f ms' % (nchange, nchange, 1000 * (time.time() - t0))
+
+    prefixes = [name[:random.randint(1, 3)] for name in random.sample(names, 100)]
+    t0 = time.time()
+    for i in xrange(nlookup):
+        index.complete(prefixes[i % len(prefixes)], limit=500)
+    print 'prefix lookup: %.1f us (limit 500)' % (1e6 * (time.time() - t0) / nlookup)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench(*args)
@@ -0,0 +1,69 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Load a large python file in TextEditor and report time to first paint with
+full and incremental highlighting.
+
+usage: python bench_highlight.py [n_lines]
+"""
+
+import sys
+import time
+
+from openalea.vpltk.qt import QtGui
+from openalea.oalab.editor.text_editor import TextEditor
+from openalea.oalab.editor.highlight import Highlighter
+
+CODE = '''
+def f_%(i)d(x, y=%(i)d):
+    """
+    docstring of f_%(i)d
+    """
+    # comment
+    return [x * y for _ in range(%(i)d)] + ["%(i)d"]
+'''
+
+
+def source(n):
+    nblock = max(n / CODE.count('\n'), 1)
+    return ''.join(CODE % dict(i=i) for i in range(nblock))
+
+
+def bench(n=50000):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+    code = source(n)
+
+    for incremental in (False, True):
+        editor = TextEditor()
+        editor.resize(800, 600)
+        editor.show()
+        highlighter = Highlighter(editor, incremental=incremental)
+        app.processEvents()
+
+        t0 = time.time()
+        editor.set_text(code)
+        editor.viewport().repaint()
+        t_paint = time.time() - t0
+        while not highlighter.is_complete():
+            app.processEvents()
+        t_full = time.time() - t0
+
+        print '%-11s: first paint %.3f s, fully highlighted %.3f s (%d lines)' % (
+            'incremental' if incremental else 'full', t_paint, t_full, editor.document().blockCount())
+        editor.close()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:2]]
+    bench(*args)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Append commands to HistoryWidget and report append cost along the session.
+
+usage: python bench_history.py [n_commands] [max_entries]
+"""
+
+import sys
+import time
+
+from openalea.vpltk.qt import QtGui
+from openalea.oalab.widget.history import HistoryWidget
+
+
+def bench(n=50000, max_entries=None):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+    history = HistoryWidget(max_entries=max_entries)
+
+    chunk = max(n / 10, 1)
+    t0 = t_chunk = time.time()
+    for i in range(n):
+        history.append('a_%d = f(a_%d, step=%d)' % (i, i - 1, i))
+        if (i + 1) % chunk == 0:
+            t = time.time()
+            print '%6d entries: %.1f us/append' % (i + 1, 1e6 * (t - t_chunk) / chunk)
+            t_chunk = t
+    app.processEvents()
+    print 'total: %.3f s for %d appends, %d blocks kept' % (
+        time.time() - t0, n, history.document().blockCount())
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench(*args)
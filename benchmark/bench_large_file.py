@@ -0,0 +1,91 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Load a large data file in rich and plain editor modes and report memory use,
+keystroke cost and text access cost.
+
+usage: python bench_large_file.py [size_in_MB]
+"""
+
+import resource
+import sys
+import time
+
+from openalea.vpltk.qt import QtCore, QtGui
+from openalea.oalab.editor.text_editor import RichTextEditor
+
+LINE = '%8d 0.125 0.250 0.500 1.000 2.000 4.000 8.000 16.00 32.00\n'
+
+
+def rss():
+    """ Resident memory in MB """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.
+    except IOError:
+        pass
+    # Peak memory only (kB on Linux, bytes on OS X)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024. * 1024.) if sys.platform == 'darwin' else maxrss / 1024.
+
+
+def bench(size=50, modes=('plain', 'rich'), nkeys=100):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+    nline = size * 1024 * 1024 / len(LINE % 0)
+    text = ''.join(LINE % i for i in xrange(nline))
+    print 'text: %.1f MB, %d lines' % (len(text) / (1024. * 1024.), nline)
+
+    for mode in modes:
+        mem0 = rss()
+        t0 = time.time()
+        editor = RichTextEditor(mode=mode)
+        editor.resize(800, 600)
+        editor.show()
+        editor.set_text(text)
+        app.processEvents()
+        t_load = time.time() - t0
+        mem_load = rss() - mem0
+
+        edit = editor.editor
+        edit.go_to_line(nline / 2)
+        t0 = time.time()
+        for i in range(nkeys):
+            event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_A, QtCore.Qt.NoModifier, 'a')
+            edit.keyPressEvent(event)
+            app.processEvents()
+        t_key = (time.time() - t0) / nkeys
+
+        t0 = time.time()
+        editor.get_text()
+        t_text = time.time() - t0
+        t0 = time.time()
+        editor.get_text()
+        t_text2 = time.time() - t0
+        t0 = time.time()
+        for line in editor.iter_lines():
+            pass
+        t_lines = time.time() - t0
+
+        print '%-5s: load %.2f s, +%.0f MB | keystroke %.2f ms | get_text %.3f s, again %.3f s | iter_lines %.3f s' % (
+            mode, t_load, mem_load, 1000 * t_key, t_text, t_text2, t_lines)
+        editor.close()
+        editor.deleteLater()
+        app.processEvents()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:2]]
+    bench(*args)
@@ -0,0 +1,80 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Simulate typing bursts in front of LintService and report, for several file sizes,
+latency between last keystroke and diagnostics, and longest GUI freeze.
+
+usage: python bench_lint.py [delay_ms]
+"""
+
+import sys
+import time
+
+from openalea.vpltk.qt import QtCore, QtGui
+from openalea.oalab.editor.lint import LintService
+
+CODE = '''
+def f_%(i)d(x, y = %(i)d):
+    import os
+    return [x*y for _ in range(%(i)d)]
+'''
+
+
+def source(n):
+    nblock = max(n / CODE.count('\n'), 1)
+    return ''.join(CODE % dict(i=i) for i in range(nblock))
+
+
+def bench(delay=500, sizes=(1000, 10000, 50000), nkeys=10):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+
+    for n in sizes:
+        code = source(n)
+        result = []
+        service = LintService(lambda: code, delay=delay)
+        service.finished.connect(result.append)
+
+        # Longest time between two ticks of a 10 ms timer = longest GUI freeze
+        ticks = [time.time()]
+        gaps = [0]
+
+        def tick():
+            t = time.time()
+            gaps[0] = max(gaps[0], t - ticks[0])
+            ticks[0] = t
+        timer = QtCore.QTimer()
+        timer.timeout.connect(tick)
+        timer.start(10)
+
+        # typing burst: a keystroke every 50 ms, each one cancels pending check
+        for i in range(nkeys):
+            service.request()
+            t_end = time.time() + 0.05
+            while time.time() < t_end:
+                app.processEvents()
+        t0 = time.time()
+        while not result:
+            app.processEvents()
+            time.sleep(0.001)
+        latency = time.time() - t0
+        timer.stop()
+
+        print '%6d lines: %5d diagnostics, latency %.3f s (lint %.3f s + delay), max GUI freeze %.1f ms' % (
+            n, len(result[0]), latency, latency - delay / 1000., 1000 * gaps[0])
+        service.cancel()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:2]]
+    bench(*args)
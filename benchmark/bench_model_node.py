@@ -0,0 +1,70 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Call a ModelNode many times (model resolved and namespace prepared once), and create model nodes with model resolved once (default)
+or resolved again for each node (previous behaviour).
+Model lookup in project is replaced by a dictionary lookup, to time oalab overhead only.
+
+usage: python bench_model_node.py [n_calls]
+"""
+
+import sys
+import time
+
+from openalea.core.model import Model
+from openalea.oalab.model import visualea
+from openalea.oalab.model.visualea import ModelNodeFactory, invalidate_model
+
+
+class AddModel(Model):
+
+    inputs_info = []
+    outputs_info = []
+
+    def get_documentation(self):
+        return 'a + b'
+
+    def __call__(self, *args, **kwargs):
+        return sum(args)
+
+
+def bench(n=100000):
+    models = {'add': AddModel(name='add')}
+    visualea._lookup_model = models.get
+    factory = ModelNodeFactory('add')
+    node = factory.instantiate()
+
+    t0 = time.time()
+    for i in xrange(n):
+        node((i, 1))
+    elapsed = time.time() - t0
+    print 'node calls:              %.3f s (%.1f us/call)' % (elapsed, 1e6 * elapsed / n)
+
+    t0 = time.time()
+    for i in xrange(n):
+        factory.get_model()
+    cached = time.time() - t0
+    print 'model resolved once:     %.3f s (%.1f us/node)' % (cached, 1e6 * cached / n)
+
+    t0 = time.time()
+    for i in xrange(n):
+        invalidate_model('add')
+        factory.get_model()
+    resolved = time.time() - t0
+    print 'model resolved per node: %.3f s (%.1f us/node)' % (resolved, 1e6 * resolved / n)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:2]]
+    bench(*args)
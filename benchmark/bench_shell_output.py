@@ -0,0 +1,56 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Print many lines in PyCutExt shell (through its stdout) and report time spent in writes, time to display
+and number of lines kept.
+
+usage: python bench_shell_output.py [n_lines] [max_lines]
+"""
+
+import sys
+import time
+from code import InteractiveInterpreter
+
+from openalea.vpltk.qt import QtGui
+from openalea.oalab.shell.shell import PyCutExt
+
+
+def bench(n=100000, max_lines=PyCutExt.max_lines):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+    shell = PyCutExt(InteractiveInterpreter())
+    shell.set_max_lines(max_lines or None)
+    shell.resize(800, 600)
+    shell.show()
+    shell.flush_output()
+    app.processEvents()
+
+    output = shell.stdout
+    frames = output.stats()['frames']
+
+    t0 = time.time()
+    for i in xrange(n):
+        output.write('[%6d] %r\n' % (i, [0.5 * i, 1.5 * i, 2.5 * i]))
+    t_write = time.time() - t0
+    while output.pending():
+        app.processEvents()
+    t_display = time.time() - t0
+    frames = output.stats()['frames'] - frames
+
+    print '%d lines: writes %.3f s, displayed after %.3f s in %d frame(s), %d lines kept' % (
+        n, t_write, t_display, frames, shell.document().blockCount())
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench(*args)
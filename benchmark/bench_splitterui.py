@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Measure splitter drag latency on a SplittableUI layout with many panes.
+Drag is simulated by several handle moves per frame, then one event loop iteration.
+
+usage: python bench_splitterui.py [n_panes] [n_frames] [moves_per_frame]
+"""
+
+import sys
+import time
+
+from openalea.vpltk.qt import QtGui, QtCore
+from openalea.oalab.widget.splitterui import SplittableUI
+
+
+def build(n_panes):
+    splittable = SplittableUI(content=QtGui.QLabel('0'))
+    splittable.resize(1600, 1200)
+    direction = QtCore.Qt.Horizontal
+    leaves = [0]
+    while len(leaves) < n_panes:
+        vid = leaves.pop(0)
+        splittable.splitPane(QtGui.QLabel(str(vid)), vid, direction, 0.5)
+        leaves.extend(splittable._g.children(vid))
+        direction = QtCore.Qt.Vertical if direction == QtCore.Qt.Horizontal else QtCore.Qt.Horizontal
+    return splittable
+
+
+def drag(app, splittable, vid, n_frames, moves_per_frame):
+    direction = splittable._g.get_property(vid, 'splitDirection')
+    t0 = time.time()
+    for frame in range(n_frames):
+        for move in range(moves_per_frame):
+            amount = 0.3 + 0.4 * ((frame * moves_per_frame + move) % 100) / 100.
+            splittable._onHandleMoved(vid, None, direction, newAmount=amount)
+        app.processEvents()
+    return (time.time() - t0) / n_frames
+
+
+def bench(n_panes=64, n_frames=200, moves_per_frame=4):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+    splittable = build(n_panes)
+    splittable.show()
+    app.processEvents()
+    print '%d panes, %d handle moves per frame' % (len(splittable.leaves()), moves_per_frame)
+
+    for coalesce in (False, True):
+        SplittableUI.COALESCE_GEOMETRY = coalesce
+        for vid, label in ((0, 'root splitter'), (splittable._g.children(0)[0], 'inner splitter')):
+            latency = drag(app, splittable, vid, n_frames, moves_per_frame)
+            print '  coalesce=%-5s %-15s %.2f ms/frame' % (coalesce, label, 1000 * latency)
+    splittable.close()
+
+
+if __name__ == '__main__':
+    bench(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,77 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Compare save and load times of a large workflow with python writer (repr/eval) and JSON format.
+Only factory is saved and loaded: node instantiation, identical in both cases, is not measured.
+
+usage: python bench_visualea_format.py [n_nodes] [repeat]
+"""
+
+import sys
+import time
+
+from openalea.core.compositenode import CompositeNodeFactory
+from openalea.oalab.model.visualea_json import factory_from_json, factory_to_json
+
+
+def chain(n):
+    elt_factory = {}
+    elt_connections = {}
+    elt_data = {}
+    elt_value = {}
+    elt_ad_hoc = {}
+    for vid in range(2, n + 2):
+        elt_factory[vid] = ('openalea.math', '+')
+        elt_data[vid] = {'block': False, 'caption': '+', 'delay': 0, 'hide': True,
+                         'id': vid, 'lazy': True, 'port_hide_changed': set(), 'priority': 0}
+        elt_value[vid] = [(1, repr(vid))]
+        elt_ad_hoc[vid] = {'position': [vid * 10., 20.], 'useUserColor': False, 'userColor': None}
+        if vid > 2:
+            elt_connections[vid] = (vid - 1, 0, vid, 0)
+    return CompositeNodeFactory('bench', elt_factory=elt_factory, elt_connections=elt_connections,
+                                elt_data=elt_data, elt_value=elt_value, elt_ad_hoc=elt_ad_hoc)
+
+
+def timeit(f, repeat):
+    t0 = time.time()
+    for i in range(repeat):
+        result = f()
+    return 1000 * (time.time() - t0) / repeat, result
+
+
+def bench(n=1000, repeat=10):
+    cnf = chain(n)
+
+    def save_py():
+        code = repr(cnf.get_writer())
+        return (' = ').join(code.split(' = ')[1:])
+
+    def load_py():
+        return eval(code_py, {'CompositeNodeFactory': CompositeNodeFactory, 'set': set})
+
+    t, code_py = timeit(save_py, repeat)
+    print 'python save: %8.1f ms (%d bytes)' % (t, len(code_py))
+    t, result = timeit(load_py, repeat)
+    print 'python load: %8.1f ms' % t
+
+    t, code_json = timeit(lambda: factory_to_json(cnf), repeat)
+    print 'json save:   %8.1f ms (%d bytes)' % (t, len(code_json))
+    t, result = timeit(lambda: factory_from_json(code_json), repeat)
+    print 'json load:   %8.1f ms' % t
+    assert result.elt_connections == cnf.elt_connections
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    bench(*args)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Measure WorldBrowser throughput when one world object is updated per step,
+compared to a full WorldModel rebuild.
+
+usage: python bench_world_browser.py [n_objects] [n_steps]
+"""
+
+import sys
+import time
+
+from openalea.vpltk.qt import QtGui
+from openalea.core.world import World
+from openalea.oalab.widget.world import WorldBrowser
+
+
+def bench(n_objects=1000, n_steps=300):
+    app = QtGui.QApplication.instance() or QtGui.QApplication([])
+
+    world = World()
+    for i in range(n_objects):
+        world['obj_%d' % i] = i
+
+    browser = WorldBrowser()
+    browser.set_world(world)
+    browser.refresh()
+    browser.show()
+    app.processEvents()
+
+    t0 = time.time()
+    for step in range(n_steps):
+        world['obj_%d' % (step % n_objects)] = float(step)
+        app.processEvents()
+    dt = time.time() - t0
+    print 'incremental: %d updates in %.3f s, %.1f updates/s (target 30)' % (n_steps, dt, n_steps / dt)
+
+    t0 = time.time()
+    for step in range(n_steps):
+        browser.model.set_world(world)
+        app.processEvents()
+    dt = time.time() - t0
+    print 'full rebuild: %d updates in %.3f s, %.1f updates/s' % (n_steps, dt, n_steps / dt)
+
+    browser.close()
+
+
+if __name__ == '__main__':
+    bench(*[int(arg) for arg in sys.argv[1:3]])
@@ -43,6 +43,8 @@ setup_requires = ['openalea.deploy']
 
 # TODO: remove pygments 1.6 constraints when https://github.com/ipython/ipython/issues/6877 is fixed
 install_requires = []
+# code checks in editors (see openalea.oalab.editor.lint)
+extras_require = {'lint': ['flake8']}
 
 # web sites where to find eggs
 dependency_links = ['http://openalea.gforge.inria.fr/pi']
@@ -71,6 +73,7 @@ setup(
     # Dependencies
     setup_requires=setup_requires,
     install_requires=install_requires,
+    extras_require=extras_require,
     dependency_links=dependency_links,
 
 
@@ -22,6 +22,9 @@ class Colormap (object):
     def __init__(self, name=None):
         self._color_points = {}
         self._color_map = None
+        self._values = np.zeros(0)
+        self._colors = np.zeros((0, 3))
+        self._luts = {}
         self.name = name
 
     def __getitem__(self, key):
@@ -43,6 +46,60 @@ class Colormap (object):
         else:
             return tuple([float(splev(value, self._color_map[channel], der=0)) for channel in [0, 1, 2]])
 
+    def get_colors(self, values, alpha=None, lut_resolution=None):
+        """
+        Vectorized version of :meth:`get_color`.
+
+        :param values: array of any shape
+        :param alpha: if not None, an alpha channel filled with this value is added
+        :param lut_resolution: if not None, values are not interpolated but
+            picked in a precomputed lookup table of this size (see :meth:`lut`)
+        :return: float array of shape values.shape + (3,) or values.shape + (4,) if alpha is set
+        """
+        values = np.asarray(values, dtype=float)
+        if len(self._values) == 0:
+            colors = np.zeros(values.shape + (3,))
+        elif lut_resolution is None:
+            colors = np.empty(values.shape + (3,))
+            for channel in [0, 1, 2]:
+                colors[..., channel] = np.interp(values, self._values, self._colors[:, channel])
+        else:
+            table = self.lut(lut_resolution)
+            vmin, vmax = self._values[0], self._values[-1]
+            if vmax > vmin:
+                index = np.clip(values, vmin, vmax) - vmin
+                index *= (lut_resolution - 1) / (vmax - vmin)
+                index = np.rint(index).astype(int)
+            else:
+                index = np.zeros(values.shape, dtype=int)
+            colors = table[index]
+
+        if alpha is not None:
+            rgba = np.empty(values.shape + (4,))
+            rgba[..., :3] = colors
+            rgba[..., 3] = alpha
+            return rgba
+        return colors
+
+    def lut(self, resolution=256):
+        """
+        Return colormap sampled on *resolution* regularly spaced values, as a (resolution, 3) array.
+        Tables are computed once per resolution and kept until colormap changes.
+        """
+        resolution = int(resolution)
+        if resolution < 1:
+            raise ValueError('lut resolution must be strictly positive, got %d' % resolution)
+        try:
+            return self._luts[resolution]
+        except KeyError:
+            if len(self._values) == 0:
+                table = np.zeros((resolution, 3))
+            else:
+                samples = np.linspace(self._values[0], self._values[-1], resolution)
+                table = self.get_colors(samples)
+            self._luts[resolution] = table
+            return table
+
     def get_values(self):
         return list(np.sort(self._color_points.keys()))
 
@@ -58,6 +115,9 @@ class Colormap (object):
 
     def _compute(self):
         from scipy.interpolate import splrep, splev
+        self._values = np.sort(self._color_points.keys())
+        self._colors = np.array([self._color_points[value] for value in self._values], dtype=float)
+        self._luts = {}
         if len(self._color_points) > 1:
             self._color_map = [splrep(np.sort(self._color_points.keys()), np.array(self._color_points.values())[
                                       np.argsort(self._color_points.keys()), channel], s=0, k=1) for channel in [0, 1, 2]]
@@ -17,30 +17,162 @@
 ###############################################################################
 __revision__ = ""
 
+import weakref
+from bisect import bisect_left
+
 from openalea.vpltk.qt import QtGui
 import keyword
 import __builtin__
 
 
+class CompletionIndex(object):
+
+    """
+    Sorted index of identifiers for case insensitive prefix lookups.
+
+    Static words (keywords, builtins, ...) are kept for the whole session. Namespace
+    names are updated incrementally: only added and removed names change the index.
+    """
+
+    def __init__(self, static=()):
+        self._static = set()
+        self._names = set()
+        self._keys = []
+        self._words = []
+        self.add_static(static)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return word in self._static or word in self._names
+
+    def _insert(self, word):
+        key = (word.lower(), word)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            self._keys.insert(i, key)
+            self._words.insert(i, word)
+
+    def _remove(self, word):
+        key = (word.lower(), word)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+            del self._words[i]
+
+    def _rebuild(self):
+        self._keys = sorted((word.lower(), word) for word in self._static | self._names)
+        self._words = [word for key, word in self._keys]
+
+    def _apply(self, added, removed):
+        # Many changes: sort once rather than inserting one by one
+        if len(added) + len(removed) > len(self._keys) / 8 + 64:
+            self._rebuild()
+        else:
+            for word in removed:
+                self._remove(word)
+            for word in added:
+                self._insert(word)
+
+    def add_static(self, words):
+        words = set(words)
+        added = words - self._static - self._names
+        self._static.update(words)
+        self._apply(added, ())
+
+    def update_namespace(self, names):
+        """
+        Replace namespace names by *names*.
+
+        :return: number of names added and removed
+        """
+        names = set(names)
+        added = names - self._names - self._static
+        removed = self._names - names - self._static
+        self._names = names
+        self._apply(added, removed)
+        return len(added) + len(removed)
+
+    def complete(self, prefix, limit=None):
+        """
+        :return: words starting with *prefix* (case insensitive), sorted.
+        """
+        prefix = prefix.lower()
+        i = bisect_left(self._keys, (prefix,))
+        words = []
+        keys = self._keys
+        n = len(keys)
+        while i < n and keys[i][0].startswith(prefix):
+            words.append(self._words[i])
+            i += 1
+            if limit is not None and len(words) >= limit:
+                break
+        return words
+
+
 class DictionaryCompleter(QtGui.QCompleter):
 
+    """
+    Completer whose model only contains words matching current prefix,
+    looked up in a :class:`CompletionIndex`.
+    """
+
+    max_completions = 500
+
     def __init__(self, parent=None):
         super(DictionaryCompleter, self).__init__(parent)
         self.basic_words = keyword.kwlist + __builtin__.__dict__.keys()
+        self.index = CompletionIndex(self.basic_words)
+        self._model = QtGui.QStringListModel(self)
+        self.setModel(self._model)
+        self._interpreter = None
 
-        self.update_dict()
-
-    def update_dict(self):
+    def update_dict(self, namespace=None):
         """
-        Use it to add new words from locals() and globals()
+        Use it to update words from namespace (dict or list of names).
+        Only names added or removed since last update are processed.
         """
-        words = self.basic_words + locals().keys() + globals().keys()
-        QtGui.QCompleter.__init__(self, words, self.parent())
+        if namespace is not None:
+            self.index.update_namespace(namespace)
 
     def add_words(self, words):
         """
         Add a list of words into dict
         """
-        words = list(words)
-        self.words = self.words + words
-        self.update_dict()
+        self.index.add_static(words)
+
+    def set_interpreter(self, interpreter):
+        """
+        Complete names defined in *interpreter* namespace.
+        With IPython shells, namespace is read again after each execution (post_execute event).
+        """
+        self._interpreter = interpreter
+        shell = getattr(interpreter, 'shell', interpreter)
+        events = getattr(shell, 'events', None)
+        if events is not None:
+            completer = weakref.ref(self)
+
+            def on_execution_done(*args, **kwargs):
+                # completer may have been closed, do not keep it alive
+                if completer() is not None:
+                    completer().update_from_interpreter()
+            events.register('post_execute', on_execution_done)
+        self.update_from_interpreter()
+
+    def update_from_interpreter(self):
+        """
+        Update words from namespace of interpreter, see :meth:`set_interpreter`.
+        """
+        interpreter = self._interpreter
+        if interpreter is None:
+            return
+        namespace = getattr(interpreter, 'user_ns', None)
+        if namespace is None:
+            namespace = getattr(interpreter, 'locals', {})
+        self.update_dict(namespace)
+
+    def setCompletionPrefix(self, prefix):
+        prefix = unicode(prefix)
+        self._model.setStringList(self.index.complete(prefix, self.max_completions))
+        QtGui.QCompleter.setCompletionPrefix(self, prefix)
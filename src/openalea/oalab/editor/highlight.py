@@ -17,43 +17,252 @@
 ###############################################################################
 __revision__ = ""
 
-from openalea.vpltk.qt import QtGui
+import os
+import time
+
+from openalea.vpltk.qt import QtCore, QtGui
+from pygments.filter import apply_filters
 from pygments.formatters.html import HtmlFormatter
-from pygments.lexers import guess_lexer_for_filename, PythonLexer
+from pygments.lexer import ExtendedRegexLexer, RegexLexer
+from pygments.lexers import (get_all_lexers, get_lexer_by_name, get_lexer_for_mimetype,
+                             guess_lexer_for_filename, PythonLexer)
 from pygments.styles import get_style_by_name
+from pygments.token import Error, Text, _TokenType
+from pygments.util import ClassNotFound
+
+# Lexer instances shared by all highlighters, by (extension, mimetype)
+_LEXERS = {}
+# Lexer aliases by extension and mimetype, built by scanning Pygments lexers once.
+# Extensions are case sensitive (*.R is S, *.r is REBOL), like Pygments filename patterns.
+_LEXER_INDEX = None
+
+
+def prewarm_lexers(filenames=()):
+    """
+    Index all Pygments lexers by extension and mimetype, then resolve lexers
+    of *filenames* so that editors opened later find them in cache.
+    """
+    global _LEXER_INDEX
+    if _LEXER_INDEX is None:
+        index = {}
+        for name, aliases, patterns, mimetypes in get_all_lexers():
+            if not aliases:
+                continue
+            keys = [mimetype for mimetype in mimetypes]
+            for pattern in patterns:
+                ext = pattern[1:]
+                if pattern.startswith('*.') and not any(c in ext for c in '*?['):
+                    keys.append(ext)
+            for key in keys:
+                lexers = index.setdefault(key, [])
+                if aliases[0] not in lexers:
+                    lexers.append(aliases[0])
+        _LEXER_INDEX = index
+    for filename in filenames:
+        get_lexer(filename)
+
+
+def _lexer_key(filename, mimetype):
+    name = os.path.basename(filename or '')
+    ext = os.path.splitext(name)[1]
+    return (ext or name, mimetype)
+
+
+def _find_lexer(filename, mimetype):
+    prewarm_lexers()
+    ext, mimetype = _lexer_key(filename, mimetype)
+    for key in (mimetype, ext):
+        aliases = _LEXER_INDEX.get(key, ())
+        if len(aliases) == 1:
+            return get_lexer_by_name(aliases[0])
+    # Names like Makefile or SConstruct are not indexed and extensions or mimetypes shared by
+    # several lexers are resolved by Pygments, using lexer priorities
+    if filename:
+        try:
+            return guess_lexer_for_filename(filename, "")
+        except ClassNotFound:
+            pass
+    if mimetype in _LEXER_INDEX:
+        return get_lexer_for_mimetype(mimetype)
+    return None
+
+
+def get_lexer(filename=None, mimetype=None):
+    """
+    Return Pygments lexer for filename extension and mimetype, or None if no lexer matches.
+    Lexers are resolved once per (extension, mimetype) and shared by all highlighters.
+    """
+    key = _lexer_key(filename, mimetype)
+    try:
+        return _LEXERS[key]
+    except KeyError:
+        lexer = _LEXERS[key] = _find_lexer(filename, mimetype)
+        return lexer
+
+
+def clear_lexer_cache():
+    global _LEXER_INDEX
+    _LEXERS.clear()
+    _LEXER_INDEX = None
+
+
+def lex(lexer, text, stack=('root',)):
+    """
+    Split *text* (one line) into (token type, value) pairs, starting from lexer state *stack*.
+
+    :return: tokens, stack at end of text. Stack is None if lexer state cannot be saved
+    (lexers not based on RegexLexer): each line is then lexed independently.
+    """
+    if not isinstance(lexer, RegexLexer) or isinstance(lexer, ExtendedRegexLexer):
+        return list(lexer.get_tokens(text)), None
+
+    # Same algorithm as RegexLexer.get_tokens_unprocessed, but starting from and
+    # returning state stack, so multi-line constructs (strings, comments) continue on next line
+    text += u'\n'
+    tokendefs = lexer._tokens
+    statestack = list(stack)
+    statetokens = tokendefs[statestack[-1]]
+    tokens = []
+    pos = 0
+    while True:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is not None:
+                    if type(action) is _TokenType:
+                        tokens.append((action, m.group()))
+                    else:
+                        tokens.extend((token, value) for _, token, value in action(lexer, m))
+                pos = m.end()
+                if new_state is not None:
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        # pop, but keep at least root state
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+                    statetokens = tokendefs[statestack[-1]]
+                break
+        else:
+            if pos >= len(text):
+                break
+            if text[pos] == u'\n':
+                # at end of line, reset state to "root"
+                statestack = ['root']
+                statetokens = tokendefs['root']
+                tokens.append((Text, u'\n'))
+            else:
+                tokens.append((Error, text[pos]))
+            pos += 1
+
+    if lexer.filters:
+        tokens = list(apply_filters(tokens, lexer.filters, lexer))
+    return tokens, tuple(statestack)
+
+
+# Block state of blocks waiting to be highlighted in incremental mode
+UNLEXED = -2
 
 
 class Highlighter(QtGui.QSyntaxHighlighter):
 
-    def __init__(self, parent, lexer=None):
+    """
+    Pygments based highlighter.
+
+    Block state stores lexer state at end of block, so when a block is edited, Qt
+    highlights following blocks only until their lexer state is unchanged.
+
+    In incremental mode, only blocks visible in the view are highlighted immediately.
+    Others are highlighted in idle time, by slices of at most *budget* milliseconds.
+    """
+
+    def __init__(self, parent, lexer=None, incremental=False, budget=10):
         super(Highlighter, self).__init__(parent)
         self._document = self.document()
         self._formatter = HtmlFormatter()
         self._lexer = lexer if lexer else PythonLexer()
+        self._states = {}
+
+        self.budget = budget
+        self._incremental = False
+        self._deadline = None
+        self._resume = 0
+        self._visible = (0, 100)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._highlight_slice)
+
+        if isinstance(parent, (QtGui.QTextEdit, QtGui.QPlainTextEdit)):
+            self._view = parent
+            self._view.verticalScrollBar().valueChanged.connect(self._on_view_scrolled)
+        else:
+            self._view = None
+
         self.set_style('default')
+        self.set_incremental(incremental)
+
+    def set_incremental(self, incremental=True):
+        """ Enable or disable incremental highlighting.
+        """
+        if incremental == self._incremental:
+            return
+        self._incremental = incremental
+        if incremental:
+            self._update_visible_range()
+        else:
+            self._timer.stop()
+            self.rehighlight()
+
+    def is_complete(self):
+        """ Return False while some blocks are waiting to be highlighted.
+        """
+        return not self._timer.isActive()
 
     def highlightBlock(self, string):
         """ Highlight a block of text.
         """
-        prev_data = self.currentBlock().previous().userData()
-        if prev_data is not None:
-            self._lexer._saved_state_stack = prev_data.syntax_stack
-        elif hasattr(self._lexer, '_saved_state_stack'):
-            del self._lexer._saved_state_stack
+        block = self.currentBlock()
+        if self._incremental and not self._may_lex(block):
+            self.setCurrentBlockState(UNLEXED)
+            self._schedule(block)
+            return
+
+        prev_data = block.previous().userData()
+        if self.previousBlockState() == UNLEXED:
+            # State is unknown, lex from root. Block will be highlighted again when
+            # previous one is.
+            prev_data = None
+        if prev_data is None:
+            stack = ('root',)
+        else:
+            stack = prev_data.syntax_stack
 
         # Lex the text using Pygments
+        tokens, stack = lex(self._lexer, string, stack)
         index = 0
-        for token, text in self._lexer.get_tokens(string):
+        for token, text in tokens:
             length = len(text)
             self.setFormat(index, length, self._get_format(token))
             index += length
 
-        if hasattr(self._lexer, '_saved_state_stack'):
-            data = PygmentsBlockUserData(
-                syntax_stack=self._lexer._saved_state_stack)
-            self.currentBlock().setUserData(data)
-            # Clean up for the next go-round.
-            del self._lexer._saved_state_stack
+        if stack is None:
+            block.setUserData(None)
+            self.setCurrentBlockState(0)
+        else:
+            block.setUserData(PygmentsBlockUserData(syntax_stack=stack))
+            self.setCurrentBlockState(self._get_state(stack))
 
     def set_style(self, style):
         """ Sets the style to the specified Pygments style.
@@ -80,6 +289,79 @@ class Highlighter(QtGui.QSyntaxHighlighter):
     # Protected interface
     #---------------------------------------------------------------------------
 
+    def _get_state(self, stack):
+        """ Returns an integer identifying lexer state stack.
+        """
+        stack = tuple(stack)
+        try:
+            return self._states[stack]
+        except KeyError:
+            state = self._states[stack] = len(self._states) + 1
+            return state
+
+    def _may_lex(self, block):
+        """ Returns True if block can be lexed now in incremental mode.
+        """
+        if self._deadline is not None and time.time() < self._deadline:
+            return True
+        first, last = self._visible
+        return first <= block.blockNumber() <= last
+
+    def _schedule(self, block):
+        self._resume = min(self._resume, block.blockNumber())
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _next_unlexed(self, block):
+        while block.isValid() and block.userState() != UNLEXED:
+            block = block.next()
+        return block
+
+    def _highlight_slice(self):
+        """ Highlight waiting blocks in document order until budget is spent.
+        """
+        if not self._incremental:
+            return
+        self._update_visible_range()
+        block = self._document.findBlockByNumber(self._resume)
+        if not block.isValid():
+            block = self._document.firstBlock()
+        self._deadline = time.time() + self.budget / 1000.
+        try:
+            block = self._next_unlexed(block)
+            while block.isValid() and time.time() < self._deadline:
+                # Following blocks are highlighted by Qt as long as lexer state changes
+                self.rehighlightBlock(block)
+                block = self._next_unlexed(block)
+        finally:
+            self._deadline = None
+
+        if block.isValid():
+            self._resume = block.blockNumber()
+            self._timer.start()
+        else:
+            self._resume = self._document.blockCount()
+
+    def _update_visible_range(self):
+        if self._view is None:
+            return
+        first = self._view.cursorForPosition(QtCore.QPoint(0, 0)).blockNumber()
+        line_height = max(self._view.fontMetrics().lineSpacing(), 1)
+        self._visible = (first, first + self._view.viewport().height() / line_height + 1)
+
+    def _on_view_scrolled(self, value=None):
+        """ Highlight newly visible blocks first.
+        """
+        if not self._incremental:
+            return
+        self._update_visible_range()
+        first, last = self._visible
+        block = self._document.findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            if block.userState() == UNLEXED:
+                self.rehighlightBlock(block)
+            block = block.next()
+
     def _clear_caches(self):
         """ Clear caches for brushes and formats.
         """
@@ -173,10 +455,13 @@ class PygmentsBlockUserData(QtGui.QTextBlockUserData):
 
 class GenericHighlighter(Highlighter):
 
-    def __init__(self, parent, lexer=None, filename="a.txt"):
-        super(GenericHighlighter, self).__init__(parent=parent, lexer=lexer)
-        self._document = self.document()
-        self._formatter = HtmlFormatter()
-        self._lexer = guess_lexer_for_filename(filename, "")
-        print(self._lexer)
-        self.set_style('default')
+    """
+    Highlighter using lexer found from filename and mimetype, see :func:`get_lexer`.
+    """
+
+    def __init__(self, parent, lexer=None, filename="a.txt", mimetype=None, **kwds):
+        if lexer is None:
+            lexer = get_lexer(filename, mimetype)
+        if lexer is None:
+            lexer = get_lexer_by_name('text')
+        super(GenericHighlighter, self).__init__(parent=parent, lexer=lexer, **kwds)
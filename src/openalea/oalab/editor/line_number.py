@@ -33,20 +33,18 @@ class Margin(QtGui.QWidget):
     def paintEvent(self, paintEvent):
         if self.showLines:
             maxheight = self.editor.viewport().height()
-            maxline = self.editor.document().blockCount()
             painter = QtGui.QPainter(self)
             painter.setPen(QtGui.QPen(QtGui.QColor(100, 100, 100)))
-            h = 0
-            line = -1
-            while h < maxheight and line < maxline:
-                cursor = self.editor.cursorForPosition(QtCore.QPoint(1, h))
-                nline = cursor.blockNumber() + 1
-                rect = self.editor.cursorRect(cursor)
-                if nline > line:
-                    line = nline
+            # Walk visible blocks only, from the first one
+            block = self.editor.cursorForPosition(QtCore.QPoint(1, 0)).block()
+            while block.isValid():
+                rect = self.editor.cursorRect(QtGui.QTextCursor(block))
+                if rect.top() > maxheight:
+                    break
+                if block.isVisible():
                     painter.drawText(0, rect.top() + 2, 40, rect.height() + 2,
-                                     QtCore.Qt.AlignHCenter | QtCore.Qt.AlignTop, str(line))
-                h = rect.top() + rect.height() + 1
+                                     QtCore.Qt.AlignHCenter | QtCore.Qt.AlignTop, str(block.blockNumber() + 1))
+                block = block.next()
             painter.end()
 
     def mousePressEvent(self, event):
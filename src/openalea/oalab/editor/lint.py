@@ -0,0 +1,175 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       File author(s): Guillaume Baty <guillaume.baty@inria.fr>
+#
+#       File contributor(s):
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Check code with flake8 outside the GUI thread.
+
+flake8 is run in a separate process, so a run can be killed as soon as its
+result is outdated and long checks never block the interface.
+"""
+
+import re
+import subprocess
+import sys
+import threading
+from collections import namedtuple
+
+from openalea.core import logger
+from openalea.vpltk.qt import QtCore
+
+__all__ = ['Diagnostic', 'LintService', 'lint', 'parse_flake8_output']
+
+Diagnostic = namedtuple('Diagnostic', ['line', 'column', 'code', 'message'])
+
+# flake8 1.x has no __main__ module, so entry point is called explicitly (flake8.run for 1.x, cli for 3.x)
+FLAKE8_MAIN = """import sys
+try:
+    from flake8.run import main
+except ImportError:
+    from flake8.main.cli import main
+sys.exit(main())
+"""
+FLAKE8_COMMAND = [sys.executable, '-c', FLAKE8_MAIN, '-']
+
+_REPORT = re.compile(r'^[^:]*:(\d+):(?:(\d+):)?\s*(\w+)\s+(.*)$')
+
+
+def parse_flake8_output(output):
+    """
+    Convert flake8 report to a list of :class:`Diagnostic`.
+    Lines and columns start at 1, column is 0 if not reported.
+    """
+    diagnostics = []
+    for line in output.splitlines():
+        match = _REPORT.match(line)
+        if match:
+            lineno, column, code, message = match.groups()
+            diagnostics.append(Diagnostic(int(lineno), int(column or 0), code, message.strip()))
+    return diagnostics
+
+
+def _encode(text):
+    if isinstance(text, unicode):
+        return text.encode('utf-8')
+    return text
+
+
+def _diagnostics(out, err, returncode):
+    # flake8 exits with 1 if it finds errors, so return code alone does not mean failure
+    diagnostics = parse_flake8_output(out)
+    if err.strip() or (returncode and not diagnostics):
+        logger.warning('flake8 failed (exit code %s): %s' % (returncode, err.strip() or out.strip()))
+    return diagnostics
+
+
+def lint(text, command=None):
+    """
+    Check text with flake8 and wait for result.
+
+    :return: list of Diagnostic
+    """
+    process = subprocess.Popen(command or FLAKE8_COMMAND, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate(_encode(text))
+    return _diagnostics(out, err, process.returncode)
+
+
+class LintService(QtCore.QObject):
+
+    """
+    Debounced background flake8 checks.
+
+    Call :meth:`request` each time text changes. Text is read with *get_text* and checked
+    only when no request has been done for *delay* milliseconds.
+    A new request cancels the current run, so only diagnostics of latest text are emitted.
+    """
+
+    finished = QtCore.Signal(object)
+
+    def __init__(self, get_text, parent=None, delay=500, command=None):
+        QtCore.QObject.__init__(self, parent)
+        self._get_text = get_text
+        self.command = command or FLAKE8_COMMAND
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._process = None
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._start)
+
+    def set_delay(self, delay):
+        self._timer.setInterval(delay)
+
+    def request(self):
+        """
+        Ask for a check of current text. Outdated run, if any, is cancelled.
+        """
+        self.cancel()
+        self._timer.start()
+
+    def check_now(self):
+        """
+        Check current text without waiting for debounce delay.
+        """
+        self.cancel()
+        self._start()
+
+    def cancel(self):
+        self._timer.stop()
+        with self._lock:
+            self._generation += 1
+            process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.kill()
+            except OSError:
+                # already finished
+                pass
+
+    def is_running(self):
+        with self._lock:
+            return self._process is not None
+
+    def _start(self):
+        text = _encode(self._get_text())
+        try:
+            process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError, e:
+            logger.warning('Cannot run flake8: %s' % e)
+            return
+        with self._lock:
+            self._process = process
+            generation = self._generation
+        worker = threading.Thread(target=self._wait, args=(process, text, generation))
+        worker.daemon = True
+        worker.start()
+
+    def _wait(self, process, text, generation):
+        try:
+            out, err = process.communicate(text)
+        except (IOError, OSError):
+            # process killed while writing text
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._process = None
+            self.finished.emit(_diagnostics(out, err, process.returncode))
@@ -1,9 +1,32 @@
 
-
 from openalea.vpltk.qt import QtGui
 from openalea.oalab.editor.text_editor import RichTextEditor
+from openalea.oalab.editor.text_editor import (edit_selected_lines, indent_lines, dedent_lines,
+                                               comment_lines, uncomment_lines)
 
 class PlainTextEdit(QtGui.QPlainTextEdit):
+    """
+    Plain text, block oriented editor.
+
+    Layout is done line by line, so typing and scrolling cost does not depend on document size.
+    Use it to edit large data or parameter files.
+    """
+
+    def __init__(self, parent=None):
+        super(PlainTextEdit, self).__init__(parent)
+        self.setLineWrapMode(QtGui.QPlainTextEdit.NoWrap)
+        font = QtGui.QFont("Courier")
+        font.setStyleHint(QtGui.QFont.Monospace)
+        font.setFixedPitch(True)
+        self.setFont(font)
+
+        # Full text is copied only once between two modifications
+        self._text = None
+        self.document().contentsChanged.connect(self._clear_text)
+
+    def _clear_text(self):
+        self._text = None
+
     def setText(self, txt):
         self.setPlainText(txt)
 
@@ -28,14 +51,45 @@ class PlainTextEdit(QtGui.QPlainTextEdit):
         :param end: is the end of what you want to get
         :return: text which is contained in the editor between 'start' and 'end'
         """
-        txt = self.toPlainText()
-        if txt is None:
-            txt = ""
-        return unicode(txt).replace(u'\u2029', u'\n') # replace paragraph separators by new lines
+        if self._text is None:
+            txt = self.toPlainText()
+            if txt is None:
+                txt = ""
+            # toPlainText already uses new lines as paragraph separators
+            self._text = unicode(txt)
+        return self._text
+
+    def iter_lines(self):
+        """
+        Iterate over lines of text without copying whole document.
+        """
+        block = self.document().firstBlock()
+        while block.isValid():
+            yield unicode(block.text())
+            block = block.next()
 
+    def line_count(self):
+        return self.document().blockCount()
 
-class PlainTextEditor(RichTextEditor):
-    def _default_editor(self, *args, **kwargs):
-        return PlainTextEdit(*args, **kwargs)
+    def indent(self):
+        edit_selected_lines(self, indent_lines)
+
+    def dedent(self):
+        edit_selected_lines(self, dedent_lines)
 
+    def comment(self):
+        edit_selected_lines(self, comment_lines)
 
+    def uncomment(self):
+        edit_selected_lines(self, uncomment_lines)
+
+    def go_to_line(self, lineno):
+        block = self.document().findBlockByNumber(lineno - 1)
+        if block.isValid():
+            self.setTextCursor(QtGui.QTextCursor(block))
+            self.ensureCursorVisible()
+
+
+class PlainTextEditor(RichTextEditor):
+    def __init__(self, parent=None):
+        super(PlainTextEditor, self).__init__(parent=parent, mode='plain')
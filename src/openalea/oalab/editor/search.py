@@ -17,16 +17,91 @@
 ###############################################################################
 __revision__ = ""
 
+import re
+import sys
+from bisect import bisect_left
+
 from openalea.vpltk.qt import QtCore, QtGui
 from openalea.core import logger
 
 
+def compile_pattern(pattern, case_sensitive=False, whole_word=False, regex=False):
+    """
+    Return compiled regular expression matching *pattern* with given options.
+    If regex is False, pattern is searched as plain text.
+    """
+    if not regex:
+        pattern = re.escape(pattern)
+    if whole_word:
+        pattern = r'\b(?:%s)\b' % pattern
+    flags = re.UNICODE | re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+def iter_matches(regexp, text):
+    """
+    Iterate over all non empty matches of compiled *regexp* in *text*, in one pass.
+    """
+    for match in regexp.finditer(text):
+        if match.end() > match.start():
+            yield match
+
+
+def find_all(text, pattern, **options):
+    """
+    :return: list of (start, end) positions of *pattern* in *text*.
+    See :func:`compile_pattern` for options.
+    """
+    return [match.span() for match in iter_matches(compile_pattern(pattern, **options), text)]
+
+
+def replace_matches(text, matches, replacement, expand=False):
+    """
+    Compute replacement of all *matches* in text.
+    If *expand* is True, group references (\\1, \\g<name>) in replacement are expanded.
+
+    :return: (start, end, new_text) where text[start:end] must be replaced by new_text.
+    """
+    if not matches:
+        return 0, 0, u''
+    start = pos = matches[0].start()
+    pieces = []
+    for match in matches:
+        pieces.append(text[pos:match.start()])
+        pieces.append(match.expand(replacement) if expand else replacement)
+        pos = match.end()
+    return start, pos, u''.join(pieces)
+
+
+if sys.maxunicode > 0xFFFF:
+    _ASTRAL = re.compile(u'[\U00010000-\U0010FFFF]', re.UNICODE)
+else:
+    # narrow build: unicode strings are already UTF-16
+    _ASTRAL = None
+
+
+def qt_offsets(text, offsets):
+    """
+    Convert positions in unicode *text* to positions in QTextDocument, that counts
+    characters outside Basic Multilingual Plane (emoji, ...) as two UTF-16 code units.
+    """
+    if _ASTRAL is None:
+        return list(offsets)
+    astral = [match.start() for match in _ASTRAL.finditer(text)]
+    if not astral:
+        return list(offsets)
+    return [offset + bisect_left(astral, offset) for offset in offsets]
+
+
 class SearchWidget(QtGui.QWidget):
 
     def __init__(self, parent=None, session=None):
         super(SearchWidget, self).__init__(parent)
 
-        self._editor = parent
+        self._editor = None
+        self._index = None
         self.hiden = True
 
         self.setMinimumSize(100, 100)
@@ -39,6 +114,7 @@ class SearchWidget(QtGui.QWidget):
         self.lineEditReplace = QtGui.QLineEdit()
         self.textSearch = QtGui.QLabel("Search :")
         self.textReplaceBy = QtGui.QLabel("Replace by :")
+        self.textCount = QtGui.QLabel()
 
         self.btnNext = QtGui.QToolButton()
         self.btnPrev = QtGui.QToolButton()
@@ -51,102 +127,157 @@ class SearchWidget(QtGui.QWidget):
         self.btnNext.setDefaultAction(self.actionSearch)
 
         self.caseBtn = QtGui.QCheckBox("Match Case")
-        self.wholeBtn = QtGui.QCheckBox("Whole Word (Disabled if case sensitive)")
+        self.wholeBtn = QtGui.QCheckBox("Whole Word")
+        self.regexBtn = QtGui.QCheckBox("Regular Expression")
 
         QtCore.QObject.connect(self.actionBackSearch, QtCore.SIGNAL('triggered(bool)'), self.searchBack)
         QtCore.QObject.connect(self.actionSearch, QtCore.SIGNAL('triggered(bool)'), self.search)
         QtCore.QObject.connect(self.actionReplace, QtCore.SIGNAL('triggered(bool)'), self.replaceall)
         QtCore.QObject.connect(self.lineEdit, QtCore.SIGNAL('returnPressed()'), self.search)
+        QtCore.QObject.connect(self.lineEdit, QtCore.SIGNAL('textChanged(const QString&)'), self.clear_index)
+        for btn in (self.caseBtn, self.wholeBtn, self.regexBtn):
+            QtCore.QObject.connect(btn, QtCore.SIGNAL('toggled(bool)'), self.clear_index)
 
         layout = QtGui.QGridLayout()
         layout.setAlignment(QtCore.Qt.AlignLeft)
 
         layout.addWidget(self.textSearch, 0, 0)
         layout.addWidget(self.lineEdit, 0, 1, 1, 2)
+        layout.addWidget(self.textCount, 0, 3)
         layout.addWidget(self.textReplaceBy, 1, 0)
         layout.addWidget(self.lineEditReplace, 1, 1, 1, 2)
 
         layout.addWidget(self.caseBtn, 2, 0)
         layout.addWidget(self.wholeBtn, 2, 1)
+        layout.addWidget(self.regexBtn, 2, 2)
 
         layout.addWidget(self.btnReplace, 3, 0)
         layout.addWidget(self.btnPrev, 3, 1)
         layout.addWidget(self.btnNext, 3, 2)
 
         self.setLayout(layout)
+        self.set_editor(parent)
 
     def set_editor(self, editor):
+        if self._editor is not None:
+            self._editor.document().contentsChanged.disconnect(self.clear_index)
         self._editor = editor
+        if editor is not None:
+            editor.document().contentsChanged.connect(self.clear_index)
+        self.clear_index()
+
+    def clear_index(self, *args):
+        """
+        Forget matches found so far. Called when text or search options change.
+        """
+        self._index = None
+
+    def regexp(self):
+        """
+        :return: compiled regular expression built from search field and options.
+        """
+        return compile_pattern(unicode(self.lineEdit.text()),
+                               case_sensitive=self.caseBtn.isChecked(),
+                               whole_word=self.wholeBtn.isChecked(),
+                               regex=self.regexBtn.isChecked())
+
+    def _text(self):
+        if hasattr(self._editor, 'get_text'):
+            return self._editor.get_text()
+        return unicode(self._editor.toPlainText())
+
+    def _find_matches(self, text=None):
+        """
+        :return: list of match objects for current search, or None if search is not valid.
+        """
+        if self._editor is None or not self.lineEdit.text():
+            return None
+        try:
+            regexp = self.regexp()
+        except re.error, e:
+            self.textCount.setText("Invalid expression")
+            logger.debug("Invalid search expression: %s" % e)
+            return None
+        if text is None:
+            text = self._text()
+        return list(iter_matches(regexp, text))
+
+    def matches(self):
+        """
+        :return: list of (start, end) document positions of all matches, found in one pass and
+                 kept until text or search options change.
+        """
+        if self._index is None:
+            text = self._text()
+            matches = self._find_matches(text)
+            if matches is None:
+                return []
+            offsets = qt_offsets(text, [pos for match in matches for pos in match.span()])
+            self._index = zip(offsets[::2], offsets[1::2])
+            self._starts = offsets[::2]
+        return self._index
+
+    def match_count(self):
+        return len(self.matches())
+
+    def _select(self, backward=False):
+        matches = self.matches()
+        if not matches:
+            self.textCount.setText("No match")
+            return False
 
-    def search(self):
-        options = None
-
-        if self.caseBtn.isChecked():
-            options = QtGui.QTextDocument.FindCaseSensitively
-
-        if self.wholeBtn.isChecked():
-            if options is None:
-                options = QtGui.QTextDocument.FindWholeWords
-            else:
-                options = options or QtGui.QTextDocument.FindWholeWords
-
-        to_search_txt = self.lineEdit.text()
-
-        if hasattr(self._editor, "find"):
-            logger.debug("Search text: " + to_search_txt)
-            if options is not None:
-                self._editor.find(to_search_txt, options)
-            else:
-                self._editor.find(to_search_txt)
+        cursor = self._editor.textCursor()
+        if backward:
+            i = bisect_left(self._starts, cursor.selectionStart()) - 1
+            if i < 0:
+                i = len(matches) - 1
         else:
-            logger.debug("Can't Search text " + to_search_txt)
+            i = bisect_left(self._starts, cursor.selectionEnd())
+            if i == len(matches):
+                i = 0
 
-    def searchBack(self):
-        options = QtGui.QTextDocument.FindBackward
+        start, end = matches[i]
+        cursor.setPosition(start, QtGui.QTextCursor.MoveAnchor)
+        cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+        self._editor.setTextCursor(cursor)
+        self.textCount.setText("%d of %d" % (i + 1, len(matches)))
+        return True
 
-        if self.caseBtn.isChecked():
-            options = options or QtGui.QTextDocument.FindCaseSensitively
-
-        if self.wholeBtn.isChecked():
-            options = options or QtGui.QTextDocument.FindWholeWords
-
-        to_search_txt = self.lineEdit.text()
+    def search(self):
+        logger.debug("Search text: " + self.lineEdit.text())
+        return self._select()
 
-        if hasattr(self._editor, "find"):
-            logger.debug("Search text: " + to_search_txt)
-            self._editor.find(to_search_txt, options)
-        else:
-            logger.debug("Can't Search text " + to_search_txt)
+    def searchBack(self):
+        logger.debug("Search text backward: " + self.lineEdit.text())
+        return self._select(backward=True)
 
     def replaceall(self):
-        # Replace all occurences without interaction
-
-        # Here I am just getting the replacement data
-        # from my UI so it will be different for you
-        old = self.lineEdit.text()
-        new = self.lineEditReplace.text()
-
-        # Beginning of undo block
+        """
+        Replace all occurences without interaction, in one edit (one undo step).
+        """
+        text = self._text()
+        matches = self._find_matches(text)
+        if not matches:
+            if matches is not None:
+                self.textCount.setText("No match")
+            return 0
+
+        new = unicode(self.lineEditReplace.text())
+        try:
+            start, end, replaced = replace_matches(text, matches, new, expand=self.regexBtn.isChecked())
+        except (re.error, IndexError), e:
+            self.textCount.setText("Invalid replacement")
+            logger.debug("Invalid replacement expression: %s" % e)
+            return 0
+
+        start, end = qt_offsets(text, (start, end))
         cursor = self._editor.textCursor()
         cursor.beginEditBlock()
-
-        # Use flags for case match
-        flags = QtGui.QTextDocument.FindFlags()
-        if self.caseBtn.isChecked():
-            flags = flags | QtGui.QTextDocument.FindCaseSensitively
-        if self.wholeBtn.isChecked():
-            flags = flags | QtGui.QTextDocument.FindWholeWords
-
-        # Replace all we can
-        while True:
-            # self.editor is the QPlainTextEdit
-            r = self._editor.find(old, flags)
-            if r:
-                qc = self._editor.textCursor()
-                if qc.hasSelection():
-                    qc.insertText(new)
-            else:
-                break
-
-        # Mark end of undo block
+        cursor.setPosition(start, QtGui.QTextCursor.MoveAnchor)
+        cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+        cursor.insertText(replaced)
         cursor.endEditBlock()
+        self._editor.setTextCursor(cursor)
+
+        self.textCount.setText("%d replaced" % len(matches))
+        return len(matches)
@@ -23,12 +23,15 @@ from openalea.oalab.editor.search import SearchWidget
 from openalea.oalab.editor.completion import DictionaryCompleter
 from openalea.oalab.editor.line_number import Margin
 from openalea.oalab.editor.goto import GoToWidget
+from openalea.oalab.editor.lint import LintService, lint
 from openalea.core import logger
 from openalea.core import settings
 
+import weakref
+
 has_flake8 = False
 try:
-    from flake8 import run
+    import flake8
     has_flake8 = True
 except ImportError:
     logger.warning("You should install **flake8** (using: pip install flake8)")
@@ -37,10 +40,17 @@ except ImportError:
 class RichTextEditor(QtGui.QWidget):
     textChanged = QtCore.Signal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, mode='rich'):
+        """
+        :param mode: 'rich' (default) or 'plain'. Plain mode uses a block oriented
+                     editor suitable for large files.
+        """
         super(RichTextEditor, self).__init__(parent)
+        self.mode = mode
 
+        from openalea.core.service.ipython import interpreter
         self.completer = DictionaryCompleter(parent=self)
+        self.completer.set_interpreter(interpreter())
 
         self.editor = self._default_editor(parent=self)
         self.editor.textChanged.connect(self.textChanged.emit)
@@ -58,6 +68,9 @@ class RichTextEditor(QtGui.QWidget):
         self.search_widget.hide()
 
     def _default_editor(self, *args, **kwargs):
+        if self.mode == 'plain':
+            from openalea.oalab.editor.plaintext_editor import PlainTextEdit
+            return PlainTextEdit(*args, **kwargs)
         return TextEditor(*args, **kwargs)
 
     def actions(self):
@@ -95,6 +108,12 @@ class RichTextEditor(QtGui.QWidget):
     def get_code(self, start='sof', end='eof'):
         return self.get_text(start=start, end=end)
 
+    def iter_lines(self):
+        """
+        Iterate over lines of text without copying whole document.
+        """
+        return self.editor.iter_lines()
+
     def replace_tab(self):
         return self.editor.replace_tab()
 
@@ -107,6 +126,12 @@ class RichTextEditor(QtGui.QWidget):
     def uncomment(self):
         self.editor.uncomment()
 
+    def indent(self):
+        self.editor.indent()
+
+    def dedent(self):
+        self.editor.dedent()
+
     def undo(self):
         self.editor.undo()
 
@@ -130,12 +155,196 @@ class RichTextEditor(QtGui.QWidget):
             self.search_widget.hiden = True
 
 
+def _to_bool(value):
+    return str(value).strip().lower() in ('true', '1', 'yes')
+
+
+def _to_unicode(value):
+    if isinstance(value, str):
+        return value.decode('utf-8')
+    return unicode(value)
+
+
+def _to_config(value):
+    # Settings are written as utf-8 str
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return str(value)
+
+
+class EditorSettings(QtCore.QObject):
+
+    """
+    Text editor settings shared by all editors.
+
+    Settings are read once. Editors registered with :meth:`register` (and slots
+    connected to *changed* signal) are notified when settings are modified or reloaded.
+    """
+
+    changed = QtCore.Signal(object)
+
+    section = "Text Editor"
+    # (key, option name, default value, conversion)
+    options = [
+        ('font', "Font", u"Courier", _to_unicode),
+        ('font_size', "Font Size", 12, int),
+        ('display_tab', "Display Tab and Spaces", True, _to_bool),
+    ]
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self._values = None
+        # Only weak references: closed editors must not be kept alive by shared settings
+        self._editors = weakref.WeakSet()
+
+    def register(self, editor):
+        """
+        Call editor.apply_settings(values) each time settings change.
+        Editor is forgotten when it is deleted, or explicitly with :meth:`unregister`.
+        """
+        self._editors.add(editor)
+
+    def unregister(self, editor):
+        self._editors.discard(editor)
+
+    def _notify(self):
+        values = self.values()
+        for editor in list(self._editors):
+            try:
+                editor.apply_settings(values)
+            except RuntimeError:
+                # underlying Qt object has already been deleted
+                self._editors.discard(editor)
+        self.changed.emit(values)
+
+    def values(self):
+        """
+        :return: dict key -> value. Settings are read on first call only.
+        """
+        if self._values is None:
+            self._values = self._read()
+        return dict(self._values)
+
+    def _read(self):
+        config = settings.Settings()
+        values = {}
+        for key, option, default, convert in self.options:
+            value = default
+            try:
+                value = convert(config.get(self.section, option))
+            except settings.NoSectionError:
+                config.add_section(self.section)
+                config.add_option(self.section, option, _to_config(default))
+            except settings.NoOptionError:
+                config.add_option(self.section, option, _to_config(default))
+            except ValueError:
+                logger.warning("%s: invalid value for %r, use %r" % (self.section, option, default))
+            values[key] = value
+        return values
+
+    def reload(self):
+        """
+        Read settings again, for example after edition in preferences, and notify editors.
+        """
+        self._values = self._read()
+        self._notify()
+
+    def set(self, save=True, **values):
+        """
+        Change settings, save them and notify all editors.
+        """
+        current = self.values()
+        current.update(values)
+        self._values = current
+        if save:
+            config = settings.Settings()
+            for key, option, default, convert in self.options:
+                try:
+                    config.set(self.section, option, _to_config(current[key]))
+                except settings.NoSectionError:
+                    config.add_section(self.section)
+                    config.add_option(self.section, option, _to_config(current[key]))
+            config.write()
+        self._notify()
+
+
+_EDITOR_SETTINGS = None
+
+
+def editor_settings():
+    """
+    :return: EditorSettings shared by all text editors.
+    """
+    global _EDITOR_SETTINGS
+    if _EDITOR_SETTINGS is None:
+        _EDITOR_SETTINGS = EditorSettings()
+    return _EDITOR_SETTINGS
+
+
 def fix_indentation(text, n=4):
     """Replace tabs by n spaces"""
     return text.replace('\t', ' ' * n)
 
 
+def indent_lines(lines, indentation="    "):
+    return [indentation + line if line.strip() else line for line in lines]
+
+
+def dedent_lines(lines, indentation="    "):
+    """Remove one level of indentation (*indentation* or a tab) from each line"""
+    n = len(indentation)
+    dedented = []
+    for line in lines:
+        if line.startswith('\t'):
+            line = line[1:]
+        else:
+            spaces = len(line) - len(line.lstrip(' '))
+            line = line[min(spaces, n):]
+        dedented.append(line)
+    return dedented
+
+
+def comment_lines(lines, prefix='#'):
+    return [prefix + line for line in lines]
+
+
+def uncomment_lines(lines, prefix='#'):
+    n = len(prefix)
+    return [line[n:] if line.startswith(prefix) else line for line in lines]
+
+
+def edit_selected_lines(editor, transform):
+    """
+    Replace lines touched by selection of *editor* (QTextEdit or QPlainTextEdit) by
+    transform(lines), in one edit, so it can be undone in one step.
+    Modified lines are selected.
+    """
+    cursor = editor.textCursor()
+    doc = editor.document()
+    first = doc.findBlock(cursor.selectionStart())
+    last = doc.findBlock(cursor.selectionEnd())
+    if last != first and cursor.selectionEnd() == last.position():
+        # selection ends at the beginning of a line: do not edit this line
+        last = last.previous()
+
+    start = first.position()
+    end = last.position() + last.length() - 1
+    cursor.setPosition(start, QtGui.QTextCursor.MoveAnchor)
+    cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+    lines = unicode(cursor.selectedText()).split(u'\u2029')
+    txt = u'\n'.join(transform(lines))
+
+    cursor.beginEditBlock()
+    cursor.insertText(txt)
+    cursor.endEditBlock()
+
+    cursor.setPosition(start, QtGui.QTextCursor.MoveAnchor)
+    cursor.setPosition(start + len(txt), QtGui.QTextCursor.KeepAnchor)
+    editor.setTextCursor(cursor)
+
+
 class TextEditor(QtGui.QTextEdit):
+    diagnosticsChanged = QtCore.Signal(object)
 
     def __init__(self, parent=None):
         super(TextEditor, self).__init__(parent)
@@ -143,6 +352,8 @@ class TextEditor(QtGui.QTextEdit):
         self.indentation = "    "
         self.completer = None
         self.name = None
+        self.linter = None
+        self.diagnostics = []
 
         # Line Number Area from LPy
         self.setViewportMargins(50, 0, 0, 0)
@@ -152,64 +363,70 @@ class TextEditor(QtGui.QTextEdit):
         self.cursorPositionChanged.connect(self.display_line_number)
         # QtCore.QObject.connect(self, QtCore.SIGNAL("cursorPositionChanged()"),self.highlightCurrentLine)
 
+        editor_settings().register(self)
         self.read_settings()
 
     def check_code(self):
         """
         Check if code follow PEP-8 guide-lines thanks to module flake8.
+        Blocks until check is done, see :meth:`enable_lint` for background checks.
+
+        :return: list of :class:`~openalea.oalab.editor.lint.Diagnostic`
         """
         if has_flake8:
-            txt = self.get_text()
-            r = run.check_code(txt)
-            return r
+            diagnostics = lint(self.get_text())
+            self.set_diagnostics(diagnostics)
+            return diagnostics
         else:
             return
 
+    def enable_lint(self, enabled=True, delay=500):
+        """
+        Check code in background while user types.
+        Code is checked when no change occured during *delay* milliseconds.
+        """
+        if enabled and self.linter is None and has_flake8:
+            self.linter = LintService(self.get_text, parent=self, delay=delay)
+            self.linter.finished.connect(self.set_diagnostics)
+            self.textChanged.connect(self.linter.request)
+            self.linter.request()
+        elif not enabled and self.linter is not None:
+            self.textChanged.disconnect(self.linter.request)
+            self.linter.cancel()
+            self.linter = None
+            self.set_diagnostics([])
+
+    def set_diagnostics(self, diagnostics):
+        """
+        Underline lines reported by *diagnostics*.
+        """
+        self.diagnostics = diagnostics
+        document = self.document()
+        selections = []
+        for diagnostic in diagnostics:
+            block = document.findBlockByNumber(diagnostic.line - 1)
+            if not block.isValid():
+                continue
+            selection = QtGui.QTextEdit.ExtraSelection()
+            selection.format.setUnderlineStyle(QtGui.QTextCharFormat.WaveUnderline)
+            selection.format.setUnderlineColor(QtGui.QColor(255, 0, 0))
+            selection.cursor = QtGui.QTextCursor(block)
+            selection.cursor.movePosition(QtGui.QTextCursor.EndOfBlock, QtGui.QTextCursor.KeepAnchor)
+            selections.append(selection)
+        self.setExtraSelections(selections)
+        self.diagnosticsChanged.emit(diagnostics)
+
     def read_settings(self):
-        config = settings.Settings()
+        self.apply_settings(editor_settings().values())
 
-        font = "Courier"
-        try:
-            font = config.get("Text Editor", "Font")
-        except settings.NoSectionError, e:
-            config.add_section("Text Editor")
-            config.add_option("Text Editor", "Font", str(font))
-        except settings.NoOptionError, e:
-            config.add_option("Text Editor", "Font", str(font))
-        self.set_font(font)
-
-        font_size = 12
-        try:
-            font_size = config.get("Text Editor", "Font Size")
-            font_size = int(font_size)
-        except settings.NoSectionError, e:
-            config.add_section("Text Editor")
-            config.add_option("Text Editor", "Font Size", str(font_size))
-        except settings.NoOptionError, e:
-            config.add_option("Text Editor", "Font Size", str(font_size))
-        self.set_font_size(font_size)
-
-        display_tab = True
-        try:
-            display_tab = config.get("Text Editor", "Display Tab and Spaces")
-            display_tab = bool(eval(display_tab))
-        except settings.NoSectionError, e:
-            config.add_section("Text Editor")
-            config.add_option("Text Editor", "Display Tab and Spaces", str(display_tab))
-        except settings.NoOptionError, e:
-            config.add_option("Text Editor", "Display Tab and Spaces", str(display_tab))
-        self.show_tab_and_spaces(display_tab)
+    def apply_settings(self, values):
+        self.set_font(values['font'])
+        self.set_font_size(values['font_size'])
+        self.show_tab_and_spaces(values['display_tab'])
 
     def write_settings(self):
-        config = settings.Settings()
-
         font = self.font()
-        config.set("Text Editor", "Font", font)
-
-        font_size = font.pointSize()
-        config.get("Text Editor", "Font Size", font_size)
-
-        config.write()
+        editor_settings().set(font=unicode(font.family()), font_size=font.pointSize())
 
     def show_tab_and_spaces(self, show=True):
         """
@@ -234,6 +451,7 @@ class TextEditor(QtGui.QTextEdit):
         font = self.font()
         font.setPointSize(size)
         self.setFont(font)
+        self.sidebar.setFont(font)
         self.set_tab_size()
 
     def set_font(self, font_name):
@@ -248,6 +466,7 @@ class TextEditor(QtGui.QTextEdit):
         font.setPointSize(size)
         font.setFixedPitch(True)
         self.setFont(font)
+        self.sidebar.setFont(font)
 
     def set_tab_size(self):
         # Set tab size : to fix
@@ -296,6 +515,15 @@ class TextEditor(QtGui.QTextEdit):
             txt = ""
         return unicode(txt).replace(u'\u2029', u'\n')  # replace paragraph separators by new lines
 
+    def iter_lines(self):
+        """
+        Iterate over lines of text without copying whole document.
+        """
+        block = self.document().firstBlock()
+        while block.isValid():
+            yield unicode(block.text())
+            block = block.next()
+
     def replace_tab(self):
         """
         replace tab by spaces
@@ -307,6 +535,19 @@ class TextEditor(QtGui.QTextEdit):
         self.set_text(txt)
 
     def keyPressEvent(self, event):
+        # Indent or dedent all selected lines
+        popup = self.completer and self.completer.popup().isVisible()
+        if event.key() in (QtCore.Qt.Key_Tab, QtCore.Qt.Key_Backtab) and not popup:
+            cursor = self.textCursor()
+            doc = self.document()
+            multiline = (doc.findBlock(cursor.selectionStart()) != doc.findBlock(cursor.selectionEnd()))
+            if event.key() == QtCore.Qt.Key_Backtab:
+                self.dedent()
+                return
+            elif multiline:
+                self.indent()
+                return
+
         # Auto-indent
         if event.key() == QtCore.Qt.Key_Tab:
             cursor = self.textCursor()
@@ -377,134 +618,38 @@ class TextEditor(QtGui.QTextEdit):
             self.completer.complete(cr)  # popup it up!
 
     ####################################################################
-    # Auto Indent (cf lpycodeeditor)
+    # Auto Indent
     ####################################################################
     def returnEvent(self):
         cursor = self.textCursor()
-        beg = cursor.selectionStart()
-        end = cursor.selectionEnd()
-        if beg == end:
-            pos = cursor.position()
-            ok = cursor.movePosition(QtGui.QTextCursor.PreviousBlock, QtGui.QTextCursor.MoveAnchor)
-            if not ok:
-                return
-            txtok = True
-            txt = ''
-            while txtok:
-                ok = cursor.movePosition(QtGui.QTextCursor.NextCharacter, QtGui.QTextCursor.KeepAnchor)
-                if not ok:
-                    break
-                txt2 = str(cursor.selection().toPlainText())
-                txtok = (txt2[-1] in ' \t')
-                if txtok:
-                    txt = txt2
-            cursor.setPosition(pos)
-            ok = cursor.movePosition(QtGui.QTextCursor.PreviousBlock, QtGui.QTextCursor.MoveAnchor)
-            if ok:
-                ok = cursor.movePosition(QtGui.QTextCursor.EndOfBlock, QtGui.QTextCursor.MoveAnchor)
-                if ok:
-                    txtok = True
-                    while txtok:
-                        ok = cursor.movePosition(QtGui.QTextCursor.PreviousCharacter, QtGui.QTextCursor.KeepAnchor)
-                        if not ok:
-                            break
-                        txt2 = str(cursor.selection().toPlainText())
-                        txtok = (txt2[0] in ' \t')
-                        if not txtok:
-                            if txt2[0] == ':':
-                                txt += self.indentation
-            cursor.setPosition(pos)
+        if cursor.hasSelection():
+            return
+        previous = cursor.block().previous()
+        if not previous.isValid():
+            return
+        txt = unicode(previous.text())
+        indent = txt[:len(txt) - len(txt.lstrip(' \t'))]
+        if txt.rstrip(' \t').endswith(':'):
+            indent += self.indentation
+        if indent:
             cursor.joinPreviousEditBlock()
-            cursor.insertText(txt)
+            cursor.insertText(indent)
             cursor.endEditBlock()
 
     ####################################################################
-    # (Un)Tab (cf lpycodeeditor)
-    # TODO
+    # (Un)Tab and (Un)Comment
     ####################################################################
-    # def tab(self, initcursor = None):
-        # if initcursor == False:
-            # initcursor = None
-        # cursor = self.textCursor() if initcursor is None else initcursor
-        # beg = cursor.selectionStart()
-        # end = cursor.selectionEnd()
-        # pos = cursor.position()
-        # if not initcursor : cursor.beginEditBlock()
-        # cursor.setPosition(beg,QtGui.QTextCursor.MoveAnchor)
-        # cursor.movePosition(QtGui.QTextCursor.StartOfBlock,QtGui.QTextCursor.MoveAnchor)
-        # while cursor.position() <= end :
-            # if self.replaceTab:
-            # cursor.insertText(self.indentation)
-            # end+=len(self.indentation)
-            # else:
-            # cursor.insertText('\t')
-            # end+=1
-            # oldpos = cursor.position()
-            # cursor.movePosition(QtGui.QTextCursor.NextBlock,QtGui.QTextCursor.MoveAnchor)
-            # if cursor.position() == oldpos:
-            # break
-        # if not initcursor : cursor.endEditBlock()
-        # cursor.setPosition(pos,QtGui.QTextCursor.MoveAnchor)
-    # def untab(self):
-        # cursor = self.textCursor()
-        # beg = cursor.selectionStart()
-        # end = cursor.selectionEnd()
-        # pos = cursor.position()
-        # cursor.beginEditBlock()
-        # cursor.setPosition(beg,QtGui.QTextCursor.MoveAnchor)
-        # cursor.movePosition(QtGui.QTextCursor.StartOfBlock,QtGui.QTextCursor.MoveAnchor)
-        # while cursor.position() <= end:
-            # cursor.movePosition(QtGui.QTextCursor.NextCharacter,QtGui.QTextCursor.KeepAnchor)
-            # if cursor.selectedText() == '\t':
-            # cursor.deleteChar()
-            # else:
-            # for i in xrange(len(self.indentation)-1):
-            # b = cursor.movePosition(QtGui.QTextCursor.NextCharacter,QtGui.QTextCursor.KeepAnchor)
-            # if not b : break
-            # if cursor.selectedText() == self.indentation:
-            # cursor.removeSelectedText()
-            # end-=1
-            # cursor.movePosition(QtGui.QTextCursor.Down,QtGui.QTextCursor.MoveAnchor)
-            # cursor.movePosition(QtGui.QTextCursor.StartOfBlock,QtGui.QTextCursor.MoveAnchor)
-        # cursor.endEditBlock()
-        # cursor.setPosition(pos,QtGui.QTextCursor.MoveAnchor)
+    def indent(self):
+        edit_selected_lines(self, lambda lines: indent_lines(lines, self.indentation))
+
+    def dedent(self):
+        edit_selected_lines(self, lambda lines: dedent_lines(lines, self.indentation))
 
-    ####################################################################
-    # (Un)Comment (cf lpycodeeditor)
-    ####################################################################
     def comment(self):
-        cursor = self.textCursor()
-        beg = cursor.selectionStart()
-        end = cursor.selectionEnd()
-        pos = cursor.position()
-        cursor.beginEditBlock()
-        cursor.setPosition(beg, QtGui.QTextCursor.MoveAnchor)
-        cursor.movePosition(QtGui.QTextCursor.StartOfBlock, QtGui.QTextCursor.MoveAnchor)
-        while cursor.position() <= end:
-            cursor.insertText('#')
-            oldpos = cursor.position()
-            cursor.movePosition(QtGui.QTextCursor.NextBlock, QtGui.QTextCursor.MoveAnchor)
-            if cursor.position() == oldpos:
-                break
-            end += 1
-        cursor.endEditBlock()
-        cursor.setPosition(pos, QtGui.QTextCursor.MoveAnchor)
+        edit_selected_lines(self, comment_lines)
 
     def uncomment(self):
-        cursor = self.textCursor()
-        beg = cursor.selectionStart()
-        end = cursor.selectionEnd()
-        cursor.beginEditBlock()
-        cursor.setPosition(beg, QtGui.QTextCursor.MoveAnchor)
-        cursor.movePosition(QtGui.QTextCursor.StartOfBlock, QtGui.QTextCursor.MoveAnchor)
-        while cursor.position() <= end:
-            cursor.movePosition(QtGui.QTextCursor.NextCharacter, QtGui.QTextCursor.KeepAnchor)
-            if True:
-                if cursor.selectedText() == '#':
-                    cursor.deleteChar()
-                    cursor.movePosition(QtGui.QTextCursor.NextBlock, QtGui.QTextCursor.MoveAnchor)
-                end -= 1
-        cursor.endEditBlock()
+        edit_selected_lines(self, uncomment_lines)
 
     ####################################################################
     # Completer
@@ -552,11 +697,10 @@ class TextEditor(QtGui.QTextEdit):
 
     def scrollContentsBy(self, dx, dy):
         self.sidebar.update()
-        self.sidebar.setFont(QtGui.QFont(self.currentFont()))
         super(TextEditor, self).scrollContentsBy(dx, dy)
 
     def display_line_number(self):
-        self.sidebar.repaint(self.sidebar.rect())
+        self.sidebar.update()
 
     ####################################################################
     # Line Number Area
@@ -25,7 +25,8 @@ from openalea.oalab.cli.parser import CommandLineParser
 
 
 def launch_lab(plugin_class):
-    from openalea.oalab.widget.splittablewindow import OALabMainWin
+    from openalea.core import logger
+    from openalea.oalab.widget.splittablewindow import OALabMainWin, AppletContainer, startup_report
     from openalea.core.settings import get_openalea_home_dir
     from openalea.core.path import path as Path
     from openalea.core.service.introspection import label
@@ -38,6 +39,8 @@ def launch_lab(plugin_class):
     OALabMainWin.DEFAULT_LAYOUT = lab_class.layout
     OALabMainWin.DEFAULT_MENU_NAMES = lab_class.menu_names
     OALabMainWin.LAB = lab_class
+    # If lab defines deferred_applets, only visible applets are created at startup
+    AppletContainer.DEFERRED_APPLETS = getattr(lab_class, 'deferred_applets', False)
     if hasattr(lab_class, "start"):
         lab_class.start()
     win = OALabMainWin(lab=lab_class, autosave=True)
@@ -53,6 +56,8 @@ def launch_lab(plugin_class):
     win.showMaximized()
     win.raise_()
 
+    logger.debug('Applet creation time (* created on first display):\n' + startup_report())
+
     return win
 
 
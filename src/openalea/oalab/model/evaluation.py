@@ -0,0 +1,281 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       File author(s): Guillaume Baty <guillaume.baty@inria.fr>
+#
+#       File contributor(s):
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Incremental evaluation of acyclic dataflows.
+
+A node needs evaluation if it has been modified (one of its inputs changed) or if it is
+not lazy. Only these nodes and their descendants are visited, in topological order.
+Inputs are propagated like in openalea.core BrutEvaluation, and lazy descendants whose
+inputs did not change are not recomputed.
+
+Dataflows with cycles or lambda variables ("X" nodes) need openalea.core evaluations
+and are not supported: :meth:`IncrementalEvaluation.start` returns False for them.
+
+Evaluation can be profiled: set :attr:`IncrementalEvaluation.profile` to an
+:class:`EvaluationProfile` to record wall time, call count and output size of each node.
+Profiles can be saved as JSON and compared with :func:`diff_profiles`.
+"""
+
+import json
+import sys
+import time
+from collections import deque
+
+try:
+    from openalea.core.system.systemnodes import LambdaVar
+except ImportError:
+    LambdaVar = ()
+
+__all__ = ['IncrementalEvaluation', 'EvaluationProfile', 'diff_profiles']
+
+
+def _posx(item):
+    # Connections to a same port are ordered by position of source node, as in core evaluations
+    npid, nvid, node = item
+    try:
+        return node.get_ad_hoc_dict().get_metadata('position')[0]
+    except Exception:
+        return 0
+
+
+def _output_size(node):
+    size = 0
+    for value in getattr(node, 'outputs', ()):
+        try:
+            size += sys.getsizeof(value)
+        except TypeError:
+            pass
+    return size
+
+
+def _caption(node):
+    try:
+        return node.get_caption()
+    except AttributeError:
+        return node.__class__.__name__
+
+
+class EvaluationProfile(object):
+
+    """
+    Wall time (in seconds), number of calls and size of outputs (in bytes) of each evaluated node.
+    Nodes are identified by their vertex id, converted to str to be JSON compatible.
+    Dataflows evaluated as a whole (cycles, lambda variables) are recorded under :attr:`workflow` key.
+    """
+
+    version = 1
+    workflow = 'workflow'
+
+    def __init__(self, nodes=None):
+        self.nodes = nodes if nodes is not None else {}
+
+    def record(self, vid, node, elapsed):
+        record = self.nodes.setdefault(str(vid), dict(name=_caption(node), calls=0, time=0., size=0))
+        record['calls'] += 1
+        record['time'] += elapsed
+        record['size'] = _output_size(node)
+
+    def total_time(self):
+        return sum(record['time'] for record in self.nodes.values())
+
+    def slowest(self, n=10):
+        """
+        Return (vid, record) list of n slowest nodes
+        """
+        return sorted(self.nodes.items(), key=lambda item: item[1]['time'], reverse=True)[:n]
+
+    def report(self):
+        return dict(version=self.version, total_time=self.total_time(), nodes=self.nodes)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f)['nodes'])
+
+
+def diff_profiles(before, after):
+    """
+    Compare two profiles (EvaluationProfile, report dict or path to saved report).
+
+    :return: dict vid -> dict(name, time, calls, size) where values are differences after - before.
+             Nodes present in one profile only are compared to zero.
+    """
+    def nodes(profile):
+        if isinstance(profile, basestring):
+            profile = EvaluationProfile.load(profile)
+        if isinstance(profile, EvaluationProfile):
+            return profile.nodes
+        return profile['nodes']
+
+    before, after = nodes(before), nodes(after)
+    empty = dict(name=None, calls=0, time=0., size=0)
+    diff = {}
+    for vid in set(before) | set(after):
+        old, new = before.get(vid, empty), after.get(vid, empty)
+        diff[vid] = dict(name=new['name'] or old['name'])
+        for key in ('time', 'calls', 'size'):
+            diff[vid][key] = new[key] - old[key]
+    return diff
+
+
+class IncrementalEvaluation(object):
+
+    def __init__(self, dataflow):
+        self.dataflow = dataflow
+        self._structure = None
+        self._order = None
+        self._lambda = False
+        self._full = False
+        self.plan = deque()
+        self.report = None
+        self.profile = None
+
+    def _update_structure(self):
+        """
+        Compute topological order if vertices or edges changed since previous call.
+
+        :return: True if structure changed
+        """
+        df = self.dataflow
+        structure = (frozenset(df.vertices()),
+                     frozenset((df.source_port(eid), df.target_port(eid)) for eid in df.edges()))
+        if structure == self._structure:
+            return False
+        self._structure = structure
+        self._order = self._topological_order()
+        self._lambda = any(isinstance(df.actor(vid), LambdaVar) for vid in df.vertices())
+        return True
+
+    def _topological_order(self):
+        df = self.dataflow
+        children = dict((vid, set(df.out_neighbors(vid))) for vid in df.vertices())
+        indegree = dict((vid, 0) for vid in children)
+        for vid, nids in children.iteritems():
+            for nid in nids:
+                indegree[nid] += 1
+
+        ready = deque(sorted(vid for vid, n in indegree.iteritems() if n == 0))
+        order = []
+        while ready:
+            vid = ready.popleft()
+            order.append(vid)
+            for nid in sorted(children[vid]):
+                indegree[nid] -= 1
+                if indegree[nid] == 0:
+                    ready.append(nid)
+        if len(order) != len(children):
+            # cycles
+            return None
+        return order
+
+    def acyclic(self):
+        self._update_structure()
+        return self._order is not None
+
+    def supported(self):
+        """
+        :return: False if dataflow has cycles or lambda variables, that only core evaluations handle.
+        """
+        self._update_structure()
+        return self._order is not None and not self._lambda
+
+    def _needs_evaluation(self, node):
+        return bool(getattr(node, 'modified', True) or not getattr(node, 'lazy', True) or
+                    getattr(node, 'delay', 0))
+
+    def start(self, full=False):
+        """
+        Plan evaluation of modified nodes and their descendants.
+        If *full* is True, or if dataflow structure changed, all nodes are planned and evaluated.
+
+        :return: False if dataflow is not supported (see :meth:`supported`).
+        """
+        changed = self._update_structure()
+        if not self.supported():
+            self.plan.clear()
+            return False
+
+        df = self.dataflow
+        self._full = full or changed
+        if self._full:
+            affected = set(self._order)
+        else:
+            affected = set()
+            todo = deque(vid for vid in self._order if self._needs_evaluation(df.actor(vid)))
+            while todo:
+                vid = todo.popleft()
+                if vid not in affected:
+                    affected.add(vid)
+                    todo.extend(df.out_neighbors(vid))
+
+        self.plan = deque(vid for vid in self._order if vid in affected)
+        self.report = dict(total=len(self._order), planned=len(self.plan), evaluated=0,
+                           skipped=len(self._order))
+        return True
+
+    def _set_inputs(self, vid):
+        df = self.dataflow
+        node = df.actor(vid)
+        for pid in df.in_ports(vid):
+            parents = [(npid, df.vertex(npid), df.actor(df.vertex(npid))) for npid in df.connected_ports(pid)]
+            if not parents:
+                continue
+            parents.sort(key=_posx)
+            values = [parent.get_output(df.local_id(npid)) for npid, nvid, parent in parents]
+            node.set_input(df.local_id(pid), values[0] if len(values) == 1 else values)
+
+    def step(self):
+        """
+        Set inputs of next planned node and evaluate it if it needs evaluation.
+
+        :return: id of visited vertex, or None if plan is empty.
+        """
+        if not self.plan:
+            return None
+        vid = self.plan.popleft()
+        node = self.dataflow.actor(vid)
+        self._set_inputs(vid)
+        if not (self._full or self._needs_evaluation(node)):
+            return vid
+        if self.profile is None:
+            node.eval()
+        else:
+            t0 = time.time()
+            node.eval()
+            self.profile.record(vid, node, time.time() - t0)
+        node.notify_listeners(('data_modified', None, None))
+        self.report['evaluated'] += 1
+        self.report['skipped'] -= 1
+        return vid
+
+    def run(self, full=False):
+        """
+        Evaluate all planned nodes.
+
+        :return: report dict (total, planned, evaluated and skipped number of nodes),
+                 or None if dataflow is not supported.
+        """
+        if not self.start(full=full):
+            return None
+        while self.plan:
+            self.step()
+        return self.report
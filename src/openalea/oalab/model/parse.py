@@ -23,6 +23,7 @@ from openalea.core.model_inout import (InputObj, OutputObj,
     parse_doc, extract_functions, parse_function, parse_doc_in_code)
 import textwrap
 import collections
+import hashlib
 from copy import copy
 
 #########################################
@@ -177,7 +178,14 @@ def parse_functions(codestring):
     Parse the code *codestring* and detect what are the functions defined inside:
       - Search *init*, *step*, *animate* and *run*
     :return: init, step, animate, run  functions (code or False)
+
+    Result is cached, see :func:`parse_model_code`.
     """
+    parsed = parse_model_code(codestring)
+    return [parsed.init, parsed.step, parsed.animate, parsed.run]
+
+
+def _parse_functions(codestring):
     exec_funcs = {}
     exec_funcs_names = ['init', 'step', 'animate', 'run']
     for func_name in exec_funcs_names:
@@ -197,3 +205,91 @@ def parse_functions(codestring):
 
     exec_funcs_list = [exec_funcs[func_name] for func_name in exec_funcs_names]
     return exec_funcs_list
+
+
+################################
+# Parsed code cache
+################################
+
+def code_hash(code):
+    """
+    :return: SHA-1 hex digest of code (str or unicode)
+    """
+    if isinstance(code, unicode):
+        code = code.encode('utf-8')
+    return hashlib.sha1(code).hexdigest()
+
+
+ParsedCode = collections.namedtuple('ParsedCode', ['doc', 'inputs', 'outputs', 'init', 'step', 'animate', 'run'])
+
+
+class ParsedCodeCache(object):
+
+    """
+    Cache of parsed python model code, keyed by hash of code content.
+    Least recently used entries are discarded when cache holds more than *maxsize* entries.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code):
+        key = code_hash(code)
+        try:
+            parsed = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            parsed = self._parse(code)
+        else:
+            self.hits += 1
+        self._entries[key] = parsed
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return parsed
+
+    def _parse(self, code):
+        model, inputs, outputs = parse_docstring(code)
+        init, step, animate, run = _parse_functions(code)
+        return ParsedCode(get_docstring(code), tuple(inputs or ()), tuple(outputs or ()), init, step, animate, run)
+
+    def info(self):
+        """
+        :return: dict with hits, misses, size and maxsize
+        """
+        return dict(hits=self.hits, misses=self.misses, size=len(self._entries), maxsize=self.maxsize)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_parsed_code_cache = ParsedCodeCache()
+
+
+def parse_model_code(code):
+    """
+    Parse python model code and return a ParsedCode namedtuple with fields
+    doc, inputs, outputs, init, step, animate and run.
+
+    Result is shared by all models with same code, so code is parsed and compiled only once.
+    Inputs and outputs are copied on each call, callers can modify them.
+    Compiled code objects are immutable and returned as is.
+    """
+    parsed = _parsed_code_cache.get(code)
+    return parsed._replace(inputs=[copy(inp) for inp in parsed.inputs],
+                           outputs=[copy(out) for out in parsed.outputs])
+
+
+def parse_cache_info():
+    """
+    :return: statistics of parsed code cache (hits, misses, size, maxsize)
+    """
+    return _parsed_code_cache.info()
+
+
+def clear_parse_cache():
+    _parsed_code_cache.clear()
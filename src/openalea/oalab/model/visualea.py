@@ -18,16 +18,24 @@
 #
 ###############################################################################
 
+from openalea.core import logger
 from openalea.core.compositenode import CompositeNodeFactory
 from openalea.core.data import Data
 from openalea.core.model import Model
 from openalea.core.node import Node, AbstractFactory
+from openalea.core.observer import AbstractListener
 from openalea.core.package import Package
 from openalea.core.pkgmanager import PackageManager
-from openalea.oalab.model.parse import InputObj, OutputObj
+from openalea.oalab.model.evaluation import IncrementalEvaluation, EvaluationProfile
+from openalea.oalab.model.parse import InputObj, OutputObj, code_hash
+from openalea.oalab.model.visualea_json import is_json, factory_from_json, factory_to_json
+from openalea.oalab.service.model_change import register_model_change_listener
 
+import ast
 import copy
+import os
 import string
+import time
 
 
 class VisualeaFile(Data):
@@ -40,6 +48,20 @@ class VisualeaFile(Data):
     mimetype = "text/x-visualea"
 
 
+class _WorkflowListener(AbstractListener):
+
+    """
+    Call *callback* with event each time listened workflow notifies a change.
+    """
+
+    def __init__(self, callback):
+        AbstractListener.__init__(self)
+        self.callback = callback
+
+    def notify(self, sender, event):
+        self.callback(event)
+
+
 class VisualeaModel(Model):
     default_name = "Workflow"
     default_file_name = "workflow.wpy"
@@ -49,10 +71,28 @@ class VisualeaModel(Model):
     dtype = default_name
     mimetype = "text/x-visualea"
 
+    # If True, run only evaluates nodes downstream of modified ones
+    incremental = False
+    # If True, time and output size of each node are recorded in "profile" (see EvaluationProfile)
+    profiling = False
+    # Format written by repr_code: 'python' (CompositeNodeFactory writer, readable by all oalab versions)
+    # or 'json' (declarative, loaded without executing code). Both formats are read by set_code.
+    save_format = 'python'
+
     def __init__(self, **kwargs):
         name = kwargs.get('name', 'Workflow')
         kwargs['name'] = name
-        self._workflow = CompositeNodeFactory(name).instantiate()
+        self._workflow = None
+        self._ports_info = {}
+        # hash of last repr_code result, reset when workflow notifies a change
+        self._repr_hash = None
+        self._workflow_listener = _WorkflowListener(self._workflow_changed)
+        self._set_workflow(CompositeNodeFactory(name).instantiate())
+        self._evaluation = None
+        self.evaluation_report = None
+        self.profile = None
+        # name is used by repr_code, that set_code may call during Model initialization
+        self.name = name
         super(VisualeaModel, self).__init__(**kwargs)
 
     def get_documentation(self):
@@ -78,11 +118,15 @@ class VisualeaModel(Model):
         cnf = CompositeNodeFactory(name)
         cn.to_factory(cnf)
 
-        repr_wf = repr(cnf.get_writer())
-        # hack to allow eval rather than exec...
-        # TODO: change the writer
+        if self.save_format == 'json':
+            repr_wf = factory_to_json(cnf)
+        else:
+            repr_wf = repr(cnf.get_writer())
+            # hack to allow eval rather than exec...
+            # TODO: change the writer
 
-        repr_wf = (' = ').join(repr_wf.split(' = ')[1:])
+            repr_wf = (' = ').join(repr_wf.split(' = ')[1:])
+        self._repr_hash = code_hash(repr_wf)
         return repr_wf
 
     def eval_value(self, value):
@@ -106,12 +150,45 @@ class VisualeaModel(Model):
         for i, inp in enumerate(self.inputs_info):
             self._workflow.set_input(i, self._ns[inp.name])
 
+    def _evaluator(self):
+        if self._evaluation is None or self._evaluation.dataflow is not self._workflow:
+            self._evaluation = IncrementalEvaluation(self._workflow)
+        return self._evaluation
+
+    def _new_profile(self, evaluation):
+        evaluation.profile = EvaluationProfile() if self.profiling else None
+
+    def _report(self, report):
+        self.evaluation_report = report
+        self.profile = self._evaluation.profile
+        if report is not None:
+            logger.debug('%s: %d nodes evaluated, %d skipped' % (self.name, report['evaluated'], report['skipped']))
+
+    def _eval_workflow(self, evaluation):
+        """
+        Evaluate whole workflow with core evaluation.
+        If profiling, only total time is recorded, nodes cannot be profiled separately.
+        """
+        if evaluation.profile is None:
+            self._workflow.eval()
+        else:
+            t0 = time.time()
+            self._workflow.eval()
+            evaluation.profile.record(EvaluationProfile.workflow, self._workflow, time.time() - t0)
+        self._report(None)
+
     def run(self, *args, **kwargs):
         """
         execute entire model
         """
         self.init(*args, **kwargs)
-        self._workflow.eval()
+        evaluation = self._evaluator()
+        evaluation.plan.clear()
+        self._new_profile(evaluation)
+        if (self.incremental or self.profiling) and evaluation.supported():
+            self._report(evaluation.run(full=not self.incremental))
+        else:
+            self._eval_workflow(evaluation)
         outputs = self._outputs()
         return outputs
 
@@ -131,13 +208,32 @@ class VisualeaModel(Model):
 
     def step(self, *args, **kwargs):
         """
-        execute only one step of the model
+        execute only one step of the model: evaluate next node of dataflow.
+        Inputs are set when a new evaluation pass starts.
         """
-        raise NotImplementedError
-        self._set_inputs()
-        self._workflow.eval_as_expression()
+        nstep = kwargs.pop('nstep', 1)
+        evaluation = self._evaluator()
+        for i in range(nstep):
+            if not evaluation.plan:
+                self.init(*args, **kwargs)
+                self._new_profile(evaluation)
+                if not evaluation.start(full=not self.incremental):
+                    # Dataflow with cycles or lambda variables, cannot be split in steps: evaluate it once
+                    self._eval_workflow(evaluation)
+                    break
+            evaluation.step()
+            if not evaluation.plan:
+                self._report(evaluation.report)
         return self._outputs()
 
+    def save_profile(self, path):
+        """
+        Save profile of last run as JSON. See openalea.oalab.model.evaluation.diff_profiles to compare two runs.
+        """
+        if self.profile is None:
+            raise ValueError('%s has not been profiled, set profiling to True and run it' % self.name)
+        self.profile.save(path)
+
     def stop(self, *args, **kwargs):
         """
         stop execution
@@ -159,71 +255,206 @@ class VisualeaModel(Model):
         return self.run()
 
     def set_code(self, code):
+        if (isinstance(code, basestring) and self._repr_hash is not None and
+                code_hash(code) == self._repr_hash):
+            # code has been generated from current workflow (editor applied), keep workflow and its state
+            return
         self._initial_code = code
         if not code:
-            self._workflow = CompositeNodeFactory(self.name).instantiate()
+            self._set_workflow(CompositeNodeFactory(self.name).instantiate())
         elif isinstance(code, CompositeNodeFactory):
-            # hakishhh
-            # CompositeNodeFactory.instantiate_node = monkey_patch_instantiate_node
-            self._workflow = code.instantiate()
+            self._set_workflow(code.instantiate())
+        elif is_json(code):
+            cnf = factory_from_json(code, factory_class=ProjectCompositeNodeFactory)
+            self._set_workflow(cnf.instantiate())
         else:
-            # Access to the current project
-            cnf = eval(code, globals(), locals())
-            # hakishhh
-            CompositeNodeFactory.instantiate_node = monkey_patch_instantiate_node
-#             raise IOError(cnf)
-            self._workflow = cnf.instantiate()
+            # Old python format, kept to read existing files
+            # Access to the current project: factory resolves model nodes (see ProjectCompositeNodeFactory)
+            cnf = eval(code, globals(), dict(CompositeNodeFactory=ProjectCompositeNodeFactory))
+            self._set_workflow(cnf.instantiate())
+
+    def _set_workflow(self, workflow):
+        if self._workflow is not None:
+            self._workflow.unregister_listener(self._workflow_listener)
+        self._workflow = workflow
+        self._ports_info.clear()
+        self._repr_hash = None
+        workflow.register_listener(self._workflow_listener)
+
+    def _workflow_changed(self, event):
+        # Workflow may differ from last repr_code
+        self._repr_hash = None
+        if event and 'port' in str(event[0]):
+            self._ports_info.clear()
+
+    def _get_ports_info(self, key, cls):
+        # Descriptors are cached until workflow notifies a port change.
+        # Number of ports is also checked in case descriptions have been edited directly.
+        desc = getattr(self._workflow, key)
+        cached = self._ports_info.get(key)
+        if cached is None or len(cached) != len(desc):
+            cached = []
+            for port in desc:
+                obj = cls()
+                obj.name = port.get('name', None)
+                obj.interface = port.get('interface', None)
+                obj.default = port.get('value', None)
+                cached.append(obj)
+            self._ports_info[key] = cached
+        # Callers may modify descriptors, cache must not be affected
+        return [copy.copy(obj) for obj in cached]
 
     @property
     def inputs_info(self):
-        inputs = []
-        for inp in self._workflow.input_desc:
-            inpobj = InputObj()
-            inpobj.name = inp.get('name', None)
-            inpobj.interface = inp.get('interface', None)
-            inpobj.default = inp.get('value', None)
-            inputs.append(inpobj)
-        return inputs
+        return self._get_ports_info('input_desc', InputObj)
 
     @inputs_info.setter
     def inputs_info(self, inputs):
         self._workflow.clear_inputs()
         for inp in inputs:
             self._workflow.add_input(name=inp.name, value=inp.default, interface=inp.interface)
+        self._ports_info.clear()
 
     @property
     def outputs_info(self):
-        outputs = []
-        for out in self._workflow.output_desc:
-            outobj = OutputObj()
-            outobj.name = out.get('name', None)
-            outobj.interface = out.get('interface', None)
-            outobj.default = out.get('value', None)
-            outputs.append(outobj)
-        return outputs
+        return self._get_ports_info('output_desc', OutputObj)
 
     @outputs_info.setter
     def outputs_info(self, outputs):
         self._workflow.clear_outputs()
         for out in outputs:
             self._workflow.add_output(name=out.name, value=out.default, interface=out.interface)
+        self._ports_info.clear()
+
+
+# Models resolved by ModelNodeFactory, by (id of active project, model name).
+# Project is stored with model so its id cannot be reused while entry exists.
+# _generation is incremented each time a model changes (see invalidate_model).
+_models = {}
+# Namespaces prepared for model nodes, by same key, stored with project and model they were built for
+_namespaces = {}
+_generation = 0
+
+
+def _active_project():
+    from openalea.core.service.project import active_project
+    return active_project()
+
+
+def _lookup_model(name):
+    from openalea.core.service.run import get_model
+    return get_model(name)
+
+
+def _same_model_name(name1, name2):
+    # Models can be referenced with or without their extension ("sum" or "sum.py")
+    return name1 == name2 or os.path.splitext(name1)[0] == os.path.splitext(name2)[0]
+
+
+def invalidate_model(name=None):
+    """
+    Tell model nodes that model *name* (all models if None) or its source changed.
+    Model is resolved again on next node creation or call.
+    """
+    global _generation
+    _generation += 1
+    for cache in (_models, _namespaces):
+        if name is None:
+            cache.clear()
+        else:
+            for key in [key for key in cache if _same_model_name(key[1], name)]:
+                del cache[key]
+
+
+register_model_change_listener(invalidate_model)
+
+
+def _in_project(model, project):
+    models = getattr(project, 'model', None)
+    if models is None:
+        return True
+    return any(m is model for m in models.values())
+
+
+def _get_model(name, project):
+    key = (id(project), name)
+    entry = _models.get(key)
+    # Model may have been reloaded in project (new model object)
+    if entry is not None and _in_project(entry[1], project):
+        return entry[1]
+    model = _lookup_model(name)
+    if model is not None:
+        _models[key] = (project, model)
+    else:
+        _models.pop(key, None)
+    return model
+
+
+def _get_namespace(name, project, model):
+    key = (id(project), name)
+    entry = _namespaces.get(key)
+    if entry is None or entry[1] is not model:
+        from openalea.core.service.run import namespace
+        entry = (project, model, namespace(model))
+        _namespaces[key] = entry
+    return entry[2]
+
+
+def _signature(args_info, out=False):
+    args = []
+    if args_info:
+        for arg in args_info:
+            d = {}
+            d['name'] = arg.name
+            if arg.interface:
+                d['interface'] = arg.interface
+            if not out and arg.default is not None:
+                d['value'] = arg.default
+            if d:
+                args.append(d)
+    return args
 
 
 class ModelNode(Node):
 
     def __init__(self, model, inputs=(), outputs=()):
-        import sys
         super(ModelNode, self).__init__(inputs=inputs, outputs=outputs)
+        self._project = None
+        self._generation = None
         self.set_model(model)
 
     def set_model(self, model):
         self.model = model
         self.__doc__ = self.model.get_documentation()
 
+    def invalidate(self):
+        """
+        Resolve model again on next call
+        """
+        self._generation = None
+
+    def _update_model(self):
+        # Model has been modified or reloaded, or active project changed
+        project = _active_project()
+        if self._generation == _generation and self._project is project:
+            return
+        factory = getattr(self, 'factory', None)
+        if isinstance(factory, ModelNodeFactory):
+            model = factory.get_model()
+            if model is not None and model is not self.model:
+                self.set_model(model)
+        self._project = project
+        self._generation = _generation
+
     def __call__(self, inputs=()):
         """ Call function. Must be overriden """
-        from openalea.core.service.run import namespace
-        outputs = self.model(*inputs, namespace=namespace(self.model))
+        self._update_model()
+        factory = getattr(self, 'factory', None)
+        name = factory.name if isinstance(factory, ModelNodeFactory) else self.model.name
+        # Namespace is prepared once per project and model (see invalidate_model).
+        # Models fill the namespace they receive, so each call gets a copy.
+        ns = _get_namespace(name, self._project, self.model)
+        outputs = self.model(*inputs, namespace=dict(ns))
         return outputs
 
 
@@ -239,6 +470,8 @@ class ModelNodeFactory(AbstractFactory):
         self.delay = delay
         self.alias = alias
         self._model = None
+        self._project = None
+        self._generation = None
 
     def get_id(self):
         return str(self.name)
@@ -261,10 +494,28 @@ class ModelNodeFactory(AbstractFactory):
         return classobj
 
     def get_documentation(self):
-        if self._model is None:
-            self.instantiate()
+        model = self.get_model()
+        if model is None:
+            return ''
+        return model.get_documentation()
 
-        return self._model.get_documentation()
+    def get_model(self):
+        """
+        Return model called by nodes, and update signature of factory.
+        Model is resolved once, and again only if active project changed or
+        model has been invalidated (see invalidate_model).
+        """
+        project = _active_project()
+        if self._model is None or self._generation != _generation or self._project is not project:
+            self._model = _get_model(self.name, project)
+            self._project = project
+            self._generation = _generation
+            if self._model:
+                self.inputs = _signature(self._model.inputs_info)
+                self.outputs = _signature(self._model.outputs_info, out=True)
+                if not self.outputs:
+                    self.outputs = (dict(name="out", interface=None),)
+        return self._model
 
     def instantiate(self, call_stack=[]):
         """
@@ -272,36 +523,14 @@ class ModelNodeFactory(AbstractFactory):
         :param call_stack: the list of NodeFactory id already in call stack
         (in order to avoir infinite recursion)
         """
-        from openalea.core.service.run import get_model
-        model = get_model(self.name)
+        model = self.get_model()
 
         if model is None:
             print "error loading model ", self.name
             # print "Available models are ", pm.cproject.model.keys()
 
-        # TODO
-        def signature(args_info, out=False):
-            args = []
-            if args_info:
-                for arg in args_info:
-                    d = {}
-                    d['name'] = arg.name
-                    if arg.interface:
-                        d['interface'] = arg.interface
-                    if not out and arg.default is not None:
-                        d['value'] = arg.default
-                    if d:
-                        args.append(d)
-            return args
-
         # If class is not a Node, embed object in a Node class
         if model:
-            # model.read()
-            self.inputs = signature(model.inputs_info)
-            self.outputs = signature(model.outputs_info, out=True)
-            if not self.outputs:
-                self.outputs = (dict(name="out", interface=None),)
-
             node = ModelNode(model, self.inputs, self.outputs)
 
             # Properties
@@ -394,6 +623,8 @@ def monkey_patch_instantiate_node(self, vid, call_stack=None):
 
     # copy node input data if any
     values = copy.deepcopy(self.elt_value.get(vid, ()))
+    # Factories read from JSON must not execute code
+    evaluate = ast.literal_eval if getattr(self, 'safe_values', False) else eval
 
     for vs in values:
         try:
@@ -401,7 +632,7 @@ def monkey_patch_instantiate_node(self, vid, call_stack=None):
             # values : port Id and port value
             # the values beyond are not used.
             port, v = vs[:2]
-            node.set_input(port, eval(v))
+            node.set_input(port, evaluate(v))
             node.input_desc[port].get_ad_hoc_dict().set_metadata("hide",
                                                                  node.is_port_hidden(port))
         except:
@@ -410,4 +641,11 @@ def monkey_patch_instantiate_node(self, vid, call_stack=None):
     return node
 
 
-CompositeNodeFactory.instantiate_node = monkey_patch_instantiate_node
+class ProjectCompositeNodeFactory(CompositeNodeFactory):
+
+    """
+    Factory of workflows read by VisualeaModel: nodes of current project are created with
+    ModelNodeFactory, see monkey_patch_instantiate_node.
+    Other CompositeNodeFactory instances keep openalea.core behaviour.
+    """
+    instantiate_node = monkey_patch_instantiate_node
@@ -0,0 +1,141 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       File author(s): Guillaume Baty <guillaume.baty@inria.fr>
+#
+#       File contributor(s):
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Declarative (JSON) serialization of CompositeNodeFactory.
+
+Contrary to python writer, loading does not execute code: only JSON is parsed.
+Python types that JSON cannot represent are tagged:
+
+  - tuple: {"__tuple__": [...]}
+  - set: {"__set__": [...]}
+  - dict with non str keys: {"__items__": [[key, value], ...]}
+  - interface class or instance: {"__interface__": [name, attributes]}, attributes is
+    null for classes and dict of literal attributes (min, max, ...) for instances.
+
+Other objects cannot be saved and raise ValueError.
+"""
+
+import json
+
+from openalea.core.compositenode import CompositeNodeFactory
+from openalea.core.interface import IInterface
+from openalea.core.service.interface import interface_class, interface_name, new_interface
+
+__all__ = ['FORMAT', 'is_json', 'factory_to_json', 'factory_from_json']
+
+FORMAT = 'openalea.visualea'
+VERSION = 1
+
+FIELDS = ('name', 'description', 'category', 'doc', 'inputs', 'outputs',
+          'elt_factory', 'elt_connections', 'elt_data', 'elt_value', 'elt_ad_hoc',
+          'lazy', 'eval_algo')
+
+
+def _encode(obj):
+    if obj is None or isinstance(obj, (bool, int, long, float, basestring)):
+        return obj
+    elif isinstance(obj, list):
+        return [_encode(elt) for elt in obj]
+    elif isinstance(obj, tuple):
+        return {'__tuple__': [_encode(elt) for elt in obj]}
+    elif isinstance(obj, (set, frozenset)):
+        return {'__set__': [_encode(elt) for elt in obj]}
+    elif isinstance(obj, dict):
+        if all(isinstance(key, basestring) for key in obj):
+            return dict((key, _encode(value)) for key, value in obj.iteritems())
+        return {'__items__': [[_encode(key), _encode(value)] for key, value in obj.iteritems()]}
+    elif isinstance(obj, IInterface):
+        attributes = dict((key, value) for key, value in obj.__dict__.iteritems()
+                          if not key.startswith('_') and _is_literal(value))
+        return {'__interface__': [interface_name(obj), attributes]}
+    elif isinstance(obj, type) and issubclass(obj, IInterface):
+        return {'__interface__': [interface_name(obj), None]}
+    else:
+        raise ValueError('Cannot save %r (%s) in visualea JSON format' % (obj, type(obj).__name__))
+
+
+def _is_literal(value):
+    if value is None or isinstance(value, (bool, int, long, float, basestring)):
+        return True
+    elif isinstance(value, (list, tuple)):
+        return all(_is_literal(elt) for elt in value)
+    return False
+
+
+def _decode_interface(name, attributes):
+    if attributes is None:
+        return interface_class(name)
+    try:
+        return new_interface(name, **dict((str(key), value) for key, value in attributes.iteritems()))
+    except TypeError:
+        # attributes not accepted by interface constructor
+        return new_interface(name)
+
+
+def _decode(obj):
+    if isinstance(obj, list):
+        return [_decode(elt) for elt in obj]
+    elif isinstance(obj, dict):
+        if len(obj) == 1:
+            tag, value = obj.items()[0]
+            if tag == '__tuple__':
+                return tuple(_decode(elt) for elt in value)
+            elif tag == '__set__':
+                return set(_decode(elt) for elt in value)
+            elif tag == '__items__':
+                return dict((_decode(key), _decode(val)) for key, val in value)
+            elif tag == '__interface__':
+                return _decode_interface(*value)
+        return dict((key, _decode(value)) for key, value in obj.iteritems())
+    else:
+        return obj
+
+
+def is_json(code):
+    """
+    Return True if code (str) has been written by :func:`factory_to_json`
+    """
+    return isinstance(code, basestring) and code.lstrip().startswith('{')
+
+
+def factory_to_json(factory):
+    """
+    :return: JSON string describing CompositeNodeFactory *factory*
+    :raise ValueError: if factory contains values that cannot be represented
+    """
+    data = dict((field, _encode(getattr(factory, field, None))) for field in FIELDS)
+    return json.dumps(dict(format=FORMAT, version=VERSION, factory=data), indent=1, sort_keys=True)
+
+
+def factory_from_json(code, factory_class=CompositeNodeFactory):
+    """
+    Create a *factory_class* instance (CompositeNodeFactory by default) from JSON string written by
+    :func:`factory_to_json`.
+    Factory is flagged with safe_values: port values are then read with ast.literal_eval, not eval.
+    """
+    data = json.loads(code)
+    if data.get('format') != FORMAT:
+        raise ValueError('Not a visualea workflow: format %r' % data.get('format'))
+    if data.get('version', 0) > VERSION:
+        raise ValueError('Unsupported visualea workflow version %s' % data['version'])
+
+    kwds = dict((str(key), _decode(value)) for key, value in data['factory'].iteritems())
+    kwds = dict((key, value) for key, value in kwds.iteritems() if value is not None)
+    factory = factory_class(**kwds)
+    factory.safe_values = True
+    return factory
@@ -38,6 +38,47 @@ from openalea.vpltk.qt import QtCore, QtGui
 from openalea.vpltk.qt.compat import getopenfilename, getsavefilename
 
 
+class ExecutionProgress(QtGui.QWidget):
+
+    """
+    Show model running in background and its progress.
+    Hidden when no model is running.
+    """
+
+    def __init__(self, parent=None):
+        QtGui.QWidget.__init__(self, parent)
+        layout = QtGui.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.label = QtGui.QLabel()
+        self.bar = QtGui.QProgressBar()
+        self.bar.setMaximumWidth(120)
+        self.bar.setMaximumHeight(16)
+        layout.addWidget(self.label)
+        layout.addWidget(self.bar)
+
+        self.hide()
+
+    def set_progress(self, name, action, done=0, total=0, pending=0):
+        text = "%s %s" % (action.capitalize(), name)
+        if pending:
+            text += " (%d pending)" % pending
+        self.label.setText(text)
+        if total:
+            self.bar.setRange(0, total)
+            self.bar.setValue(done)
+            self.bar.setFormat("%v/%m")
+        else:
+            # busy indicator
+            self.bar.setRange(0, 0)
+        self.show()
+
+    def reset(self):
+        self.label.clear()
+        self.bar.reset()
+        self.hide()
+
+
 class ParadigmContainer(QtGui.QTabWidget):
 
     """
@@ -62,6 +103,11 @@ class ParadigmContainer(QtGui.QTabWidget):
 
         self._open_objects = {}
 
+        # If set, models are run by this engine outside GUI thread, see set_background_execution
+        self.engine = None
+        self.execution_progress = ExecutionProgress(self)
+        self.setCornerWidget(self.execution_progress, QtCore.Qt.TopRightCorner)
+
         self.connect(self, QtCore.SIGNAL('tabCloseRequested(int)'), self.auto_close)
         self.connect(self, QtCore.SIGNAL('currentChanged(int)'), self.safe_display_help)
 
@@ -304,29 +350,78 @@ class ParadigmContainer(QtGui.QTabWidget):
         self.currentWidget().applet.execute()
         logger.debug("Execute selected part " + self.currentWidget().applet.name)
 
+    def set_background_execution(self, enabled=True):
+        """
+        If enabled, run, step, animate and init are executed in a background thread.
+        Requests are queued per model and stop cancels running and pending requests.
+        Models must then be thread-safe, see openalea.oalab.paradigm.engine.
+        """
+        if enabled and self.engine is None:
+            from openalea.oalab.paradigm.engine import ModelExecutionEngine
+            self.engine = ModelExecutionEngine(self)
+            self.engine.started.connect(self._on_execution_started)
+            self.engine.progress.connect(self._on_execution_progress)
+            self.engine.finished.connect(self._on_execution_finished)
+            self.engine.stopped.connect(self._on_execution_stopped)
+            self.engine.failed.connect(self._on_execution_failed)
+            self.engine.idle.connect(self.execution_progress.reset)
+        elif not enabled and self.engine is not None:
+            self.engine.stop_all()
+            self.engine = None
+            self.execution_progress.reset()
+
+    def _on_execution_started(self, name, action):
+        self.execution_progress.set_progress(name, action, pending=self.engine.pending())
+        logger.debug("%s %s started" % (action.capitalize(), name))
+
+    def _on_execution_progress(self, name, action, done, total):
+        self.execution_progress.set_progress(name, action, done, total, pending=self.engine.pending())
+
+    def _on_execution_finished(self, name, action, result):
+        logger.debug("%s %s finished" % (action.capitalize(), name))
+
+    def _on_execution_stopped(self, name, action):
+        logger.debug("%s %s stopped" % (action.capitalize(), name))
+
+    def _on_execution_failed(self, name, action, error):
+        mbox = QtGui.QMessageBox(self)
+        mbox.setIcon(QtGui.QMessageBox.Critical)
+        mbox.setWindowTitle("%s %s failed" % (action.capitalize(), name))
+        mbox.setText(error.strip().splitlines()[-1] if error.strip() else error)
+        mbox.setDetailedText(error)
+        mbox.show()
+
+    def _execute_model(self, action, *args, **kwargs):
+        applet = self.currentWidget().applet
+        if self.engine is None:
+            getattr(applet, action)(*args, **kwargs)
+        else:
+            self.engine.submit(applet, action, *args, **kwargs)
+        logger.debug("%s %s" % (action.capitalize(), applet.name))
+
     def run(self):
-        self.currentWidget().applet.run()
-        logger.debug("Run " + self.currentWidget().applet.name)
+        self._execute_model('run')
 
     def run_in_shell(self):
         self.currentWidget().applet.run(run_in_shell=True)
         logger.debug("Run " + self.currentWidget().applet.name)
 
     def animate(self):
-        self.currentWidget().applet.animate()
-        logger.debug("Animate " + self.currentWidget().applet.name)
+        self._execute_model('animate')
 
     def step(self):
-        self.currentWidget().applet.step()
-        logger.debug("Step " + self.currentWidget().applet.name)
+        self._execute_model('step')
 
     def stop(self):
-        self.currentWidget().applet.stop()
-        logger.debug("Stop " + self.currentWidget().applet.name)
+        applet = self.currentWidget().applet
+        if self.engine is not None and applet.runnable():
+            self.engine.stop(applet.model)
+        else:
+            applet.stop()
+        logger.debug("Stop " + applet.name)
 
     def init(self):
-        self.currentWidget().applet.init()
-        logger.debug("Init " + self.currentWidget().applet.name)
+        self._execute_model('init')
 
 
 class ModelEditorApplet(ParadigmContainer):
@@ -340,9 +435,13 @@ class ModelEditorApplet(ParadigmContainer):
         # Create actions
         self.actionRun = QtGui.QAction(qicon("run.png"), "Run", self)
         self.actionRunInShell = QtGui.QAction(qicon("run.png"), "Run in shell", self)
+        self.actionRunInBackground = QtGui.QAction("Run in background", self)
+        self.actionRunInBackground.setCheckable(True)
 
         menu_run = QtGui.QMenu("Run", self)
         menu_run.addActions([self.actionRun, self.actionRunInShell])
+        menu_run.addSeparator()
+        menu_run.addAction(self.actionRunInBackground)
 
         self.toolbutton_run = QtGui.QToolButton(self)
         self.toolbutton_run.setMenu(menu_run)
@@ -401,6 +500,7 @@ class ModelEditorApplet(ParadigmContainer):
         self.actionRunSelection.triggered.connect(self.execute)
         self.actionStep.triggered.connect(self.step)
         self.actionStop.triggered.connect(self.stop)
+        self.actionRunInBackground.toggled.connect(self.set_background_execution)
 
         self.actionCloseCurrent.triggered.connect(self.close_current)
         self.actionOpenFile.triggered.connect(self.open_file)
@@ -22,6 +22,8 @@ from openalea.core.service.control import control_namespace
 from openalea.core.data import Data
 from openalea.core.model import Model
 from openalea.core.service.run import namespace
+from openalea.oalab.model.parse import code_hash
+from openalea.oalab.service.model_change import model_changed
 
 
 def check_mutually_exclusive(kwds, name1, name2):
@@ -49,6 +51,10 @@ class ParadigmController(object):
     def __init__(self, **kwds):
         self.parent = kwds.pop('parent', None)
         self._widget = None
+        # Hash of last content set to model, to avoid parsing unchanged code again,
+        # and code held by model at that time, to detect code set by other means (reload, ...)
+        self._applied = None
+        self._applied_code = None
 
         mode_name, name_value = check_mutually_exclusive(kwds, 'name', 'filepath')
         mode_model, model_value = check_mutually_exclusive(kwds, 'model', 'data')
@@ -76,12 +82,15 @@ class ParadigmController(object):
             self._model = self._obj
         else:
             self._model = to_model(self._obj)
+        if self._model is not None:
+            model_changed(self._model.name)
 
     def read(self):
         if self._widget is None:
             return
         content = self.value()
         self.set_widget_value(content)
+        self._set_applied(self._hash(content))
 
     def apply(self):
         if self._widget is None:
@@ -102,13 +111,42 @@ class ParadigmController(object):
     def set_widget_value(self, value):
         raise NotImplementedError
 
+    def _hash(self, value):
+        if isinstance(value, basestring):
+            return code_hash(value)
+        return None
+
+    def _model_code(self):
+        # Models keep code in _initial_code, replaced each time their code is set
+        return getattr(self._model, '_initial_code', None)
+
+    def _set_applied(self, key):
+        self._applied = key
+        self._applied_code = self._model_code()
+
+    def is_applied(self, value):
+        """
+        Return True if *value* has been set to model by this controller and model code has not
+        been changed since, by this controller or other means (project reload, model.set_code, ...)
+        """
+        key = self._hash(value)
+        if key is None or key != self._applied:
+            return False
+        return self._applied_code is not None and self._model_code() is self._applied_code
+
     def set_value(self, value):
+        if self.is_applied(value):
+            # Content has not changed since last apply, model is up to date
+            return
         if self._type == Model:
             self._obj.set_code(value)
         else:
             self._obj.content = value
             if self._model:
                 self._model.set_code(value)
+        self._set_applied(self._hash(value))
+        if self._model is not None:
+            model_changed(self._model.name)
 
     def runnable(self):
         return self._model is not None
@@ -124,29 +162,44 @@ class ParadigmController(object):
     def namespace(self, model, **kwargs):
         return namespace(model, **kwargs)
 
-    def run(self, *args, **kwargs):
+    def prepare_execution(self, action, *args, **kwargs):
+        """
+        Called in GUI thread before model *action* ('run', 'step', 'animate' or 'init') is executed.
+        Editor content is applied to model and keyword arguments passed to execute_model are returned.
+        Override it to set up Qt objects used by model (viewers, ...).
+        """
+        self.apply()
+        if action == 'step':
+            return kwargs
+        return self.namespace(self.model, **kwargs)
+
+    def execute_model(self, action, *args, **kwargs):
+        """
+        Call model *action* with arguments returned by prepare_execution.
+        Can be called outside GUI thread (see ModelExecutionEngine), so it must not use Qt.
+        """
+        return getattr(self.model, action)(*args, **kwargs)
+
+    def _execute(self, action, *args, **kwargs):
         if self.runnable():
-            self.apply()
-            return self.model.run(*args, **self.namespace(self.model, **kwargs))
+            kwargs = self.prepare_execution(action, *args, **kwargs)
+            return self.execute_model(action, *args, **kwargs)
+
+    def run(self, *args, **kwargs):
+        return self._execute('run', *args, **kwargs)
 
     def step(self, nstep=1):
-        if self.runnable():
-            self.apply()
-            return self.model.step(nstep=nstep)
+        return self._execute('step', nstep=nstep)
 
     def stop(self):
         if self.runnable():
             return self.model.stop()
 
     def animate(self, *args, **kwargs):
-        if self.runnable():
-            self.apply()
-            return self.model.animate(*args, **self.namespace(self.model, **kwargs))
+        return self._execute('animate', *args, **kwargs)
 
     def init(self, *args, **kwargs):
-        if self.runnable():
-            self.apply()
-            return self.model.init(*args, **self.namespace(self.model, **kwargs))
+        return self._execute('init', *args, **kwargs)
 
     def widget(self):
         """
@@ -0,0 +1,232 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       File author(s): Guillaume Baty <guillaume.baty@inria.fr>
+#
+#       File contributor(s):
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Run models outside the GUI thread.
+
+Each model gets its own queue of pending requests, processed in order by a worker thread.
+Requests are dispatched through paradigm controllers: :meth:`ParadigmController.prepare_execution`
+is called in GUI thread when request is submitted (editor content, namespace, viewers),
+then :meth:`ParadigmController.execute_model` is called by the worker.
+
+Models executed by this engine must be thread-safe: they must not create or modify Qt
+widgets directly. Qt objects must be used through signals, or prepared in
+prepare_execution.
+
+Models can report progress and check for cancellation with :func:`report_progress`
+and :func:`cancelled`, for example::
+
+    from openalea.oalab.paradigm.engine import report_progress, cancelled
+
+    def animate():
+        for i in range(1000):
+            if cancelled():
+                break
+            step()
+            report_progress(i + 1, 1000)
+"""
+
+import threading
+import traceback
+from collections import deque
+
+from openalea.core import logger
+from openalea.vpltk.qt import QtCore
+
+__all__ = ['ModelExecutionEngine', 'ExecutionRequest', 'report_progress', 'cancelled']
+
+_current = threading.local()
+
+
+def _current_request():
+    return getattr(_current, 'request', None)
+
+
+def report_progress(done, total=0):
+    """
+    Report progress of model being executed in current thread.
+    Does nothing if model is not run by a :class:`ModelExecutionEngine`.
+    """
+    request = _current_request()
+    if request is not None:
+        request.engine._report_progress(request, done, total)
+
+
+def cancelled():
+    """
+    Return True if execution of model in current thread has been cancelled.
+    """
+    request = _current_request()
+    return request is not None and request.cancelled.is_set()
+
+
+class ExecutionRequest(object):
+
+    def __init__(self, engine, controller, action, args=(), kwargs=None):
+        self.engine = engine
+        self.controller = controller
+        self.model = controller.model
+        self.action = action
+        self.args = args
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.cancelled = threading.Event()
+
+    name = property(fget=lambda self: self.model.name)
+
+
+class ModelExecutionEngine(QtCore.QObject):
+
+    """
+    Execute model actions in background threads.
+
+    Signals are emitted from worker threads and so delivered in GUI thread through Qt event loop.
+    All of them, except idle, pass model name and action ('run', 'step', 'animate' or 'init').
+    idle is emitted when last request of all models has been processed.
+    """
+
+    started = QtCore.Signal(str, str)
+    progress = QtCore.Signal(str, str, int, int)
+    finished = QtCore.Signal(str, str, object)
+    failed = QtCore.Signal(str, str, str)
+    stopped = QtCore.Signal(str, str)
+    idle = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._workers = {}
+        self._running = {}
+
+    def submit(self, controller, action, *args, **kwargs):
+        """
+        Queue *action* of controller's model.
+        Must be called from GUI thread: controller.prepare_execution is called immediately.
+
+        :return: ExecutionRequest or None if controller has no runnable model
+        """
+        if not controller.runnable():
+            return None
+        model = controller.model
+        kwargs = controller.prepare_execution(action, *args, **kwargs)
+        request = ExecutionRequest(self, controller, action, args, kwargs)
+
+        key = id(model)
+        with self._lock:
+            self._queues.setdefault(key, deque()).append(request)
+            if key not in self._workers:
+                worker = threading.Thread(target=self._process, args=(key,), name='oalab-%s' % model.name)
+                worker.daemon = True
+                self._workers[key] = worker
+                worker.start()
+        return request
+
+    def pending(self, model=None):
+        """
+        Return number of requests waiting for *model*, or for all models if model is None
+        (running ones excluded)
+        """
+        with self._lock:
+            if model is None:
+                return sum(len(queue) for queue in self._queues.values())
+            return len(self._queues.get(id(model), ()))
+
+    def is_running(self, model=None):
+        with self._lock:
+            if model is None:
+                return bool(self._running)
+            return id(model) in self._running
+
+    def stop(self, model):
+        """
+        Cancel running request and drop pending requests of *model*.
+        Cancellation is cooperative: model.stop is called and models can check :func:`cancelled`.
+        """
+        key = id(model)
+        with self._lock:
+            dropped = list(self._queues.pop(key, ()))
+            running = self._running.get(key)
+        for request in dropped:
+            request.cancelled.set()
+            self.stopped.emit(request.name, request.action)
+        if running is not None:
+            running.cancelled.set()
+            model.stop()
+
+    def stop_all(self):
+        with self._lock:
+            models = [request.model for request in self._running.values()]
+            models += [queue[0].model for queue in self._queues.values() if queue]
+        for model in models:
+            self.stop(model)
+
+    def _process(self, key):
+        while True:
+            with self._lock:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._queues.pop(key, None)
+                    del self._workers[key]
+                    idle = not self._workers
+                    request = None
+                else:
+                    request = queue.popleft()
+                    self._running[key] = request
+            if request is None:
+                if idle:
+                    self.idle.emit()
+                return
+            try:
+                self._execute(request)
+            finally:
+                with self._lock:
+                    del self._running[key]
+
+    def _execute(self, request):
+        name, action = request.name, request.action
+        _current.request = request
+        self.started.emit(name, action)
+        try:
+            if action == 'step':
+                result = self._step(request)
+            else:
+                result = request.controller.execute_model(action, *request.args, **request.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            logger.error('%s %s: %s' % (action, name, error))
+            self.failed.emit(name, action, error)
+        else:
+            if request.cancelled.is_set():
+                self.stopped.emit(name, action)
+            else:
+                self.finished.emit(name, action, result)
+        finally:
+            _current.request = None
+
+    def _step(self, request):
+        # Split steps to check cancellation and report progress between each of them
+        nstep = request.kwargs.pop('nstep', 1)
+        result = None
+        for i in range(nstep):
+            if request.cancelled.is_set():
+                break
+            result = request.controller.execute_model('step', *request.args, **request.kwargs)
+            self._report_progress(request, i + 1, nstep)
+        return result
+
+    def _report_progress(self, request, done, total):
+        self.progress.emit(request.name, request.action, done, total)
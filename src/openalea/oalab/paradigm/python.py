@@ -45,7 +45,8 @@ class PythonModelController(ParadigmController):
             from openalea.oalab.editor.text_editor import RichTextEditor as Editor
             from openalea.oalab.editor.highlight import Highlighter
             editor = Editor(parent=self.parent)
-            Highlighter(editor.editor)
+            Highlighter(editor.editor, incremental=True)
+            editor.editor.enable_lint()
 
         from openalea.oalab.service.drag_and_drop import add_drop_callback
 
@@ -20,12 +20,11 @@
 __revision__ = ""
 
 
-from openalea.oalab.editor.highlight import Highlighter
+from openalea.oalab.editor.highlight import GenericHighlighter, get_lexer
 from openalea.oalab.editor.text_editor import RichTextEditor as Editor
 from openalea.oalab.paradigm.controller import ParadigmController
 from openalea.oalab.service.help import display_help
-from pygments.lexers import guess_lexer_for_filename
-from pygments.util import ClassNotFound
+from pygments.lexers import TextLexer
 import types
 
 
@@ -39,6 +38,10 @@ class TextualModelController(ParadigmController):
     def _default_editor(self):
         from openalea.oalab.editor.plaintext_editor import PlainTextEditor as Editor
         editor = Editor(parent=self.parent)
+        path = getattr(self._obj, 'path', None)
+        lexer = get_lexer(filename=str(path) if path else None, mimetype=getattr(self._obj, 'mimetype', None))
+        if lexer is not None and not isinstance(lexer, TextLexer):
+            GenericHighlighter(editor.editor, lexer=lexer, incremental=True)
         return editor
 
     def instantiate_widget(self):
@@ -148,12 +148,12 @@ class VisualeaModelController(ParadigmController):
         ns.update(project_ns)
         return ns
 
-    def init(self, *args, **kwargs):
-        # todo : register plotter
-        if not VIEWER3D_SET:
+    def prepare_execution(self, action, *args, **kwargs):
+        # Plotter is registered in GUI thread, even if model is run in background
+        if action == 'init' and not VIEWER3D_SET:
             _set_viewer3d()
 
-        return ParadigmController.init(self, *args, **kwargs)
+        return ParadigmController.prepare_execution(self, action, *args, **kwargs)
 
 
 def adapt_widget(widget, methods):
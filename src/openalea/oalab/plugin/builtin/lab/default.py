@@ -26,6 +26,9 @@ class DefaultLab(MiniLab):
     # NEW LAYOUT API
     menu_names = ('File', 'Edit', 'View', 'Help')
 
+    # Applets of hidden tabs (World, Logger, ...) are created when their tab is first displayed
+    deferred_applets = True
+
     layout = {
         'children': {0: [1, 2], 2: [3, 4], 3: [5, 6], 4: [7, 8], 7: [11, 12], 8: [9, 10]},
         'parents': {0: None, 1: 0, 2: 0, 3: 2, 4: 2, 5: 3, 6: 3, 7: 4, 8: 4, 9: 8, 10: 8, 11: 7, 12: 7},
@@ -49,6 +49,9 @@ class MiniLab(object):
     # NEW LAYOUT API
     menu_names = ('File', 'Edit', 'Help')
 
+    # If True, applets in hidden tabs are created on first display
+    deferred_applets = False
+
     layout = {'parents': {0: None, 1: 0, 2: 0, 3: 1, 4: 1},
               'properties': {0: {u'amount': 0.6957746478873239,
                                  u'splitDirection': 2},
@@ -0,0 +1,46 @@
+# -*- python -*-
+#
+#       OpenAlea.OALab: Multi-Paradigm GUI
+#
+#       Copyright 2015 INRIA - CIRAD - INRA
+#
+#       File author(s): Guillaume Baty <guillaume.baty@inria.fr>
+#
+#       File contributor(s):
+#
+#       Distributed under the Cecill-C License.
+#       See accompanying file LICENSE.txt or copy at
+#           http://www.cecill.info/licences/Licence_CeCILL-C_V1-en.html
+#
+#       OpenAlea WebSite : http://openalea.gforge.inria.fr
+#
+###############################################################################
+"""
+Service to notify that a model has been loaded or that its code changed.
+Caches derived from models (model nodes for example) register a listener to be invalidated.
+"""
+
+__all__ = ['model_changed', 'register_model_change_listener', 'unregister_model_change_listener']
+
+__registry = []
+
+
+def register_model_change_listener(listener):
+    """
+    *listener* is a callable, called with model name each time a model is loaded or its code changed.
+    """
+    if listener not in __registry:
+        __registry.append(listener)
+
+
+def unregister_model_change_listener(listener):
+    if listener in __registry:
+        __registry.remove(listener)
+
+
+def model_changed(name):
+    """
+    Notify listeners that model *name* has been loaded or modified.
+    """
+    for listener in __registry:
+        listener(name)
@@ -16,14 +16,65 @@ If it's a list, search widget for first shape. If no widgets found, search for s
 """
 
 
+# Registry of widget plugins indexed by interface name, filled on first use.
+# Lookup caches below are derived from it and must be cleared with it.
+_QT_WIDGET_PLUGINS = None
+_QT_EDITOR_CLASS_CACHE = {}
+_QT_PAINTER_PLUGIN_CACHE = {}
+
+
 def discover_qt_controls():
     return plugins('oalab.plugin', criteria=dict(implement='IWidgetSelector'))
 
 
+def _as_key(value):
+    if value is None or isinstance(value, basestring):
+        return value
+    return tuple(value)
+
+
+def _qt_widget_registry():
+    global _QT_WIDGET_PLUGINS
+    if _QT_WIDGET_PLUGINS is None:
+        registry = {}
+        for plugin in discover_qt_controls():
+            for iname in plugin.controls:
+                registry.setdefault(iname, []).append(plugin)
+        _QT_WIDGET_PLUGINS = registry
+    return _QT_WIDGET_PLUGINS
+
+
+def reload_qt_controls():
+    """
+    Forget all known Qt control plugins and cached lookups.
+    Call it when new widget plugins have been installed, plugins are discovered again on next request.
+    """
+    global _QT_WIDGET_PLUGINS
+    _QT_WIDGET_PLUGINS = None
+    _QT_EDITOR_CLASS_CACHE.clear()
+    _QT_PAINTER_PLUGIN_CACHE.clear()
+
+
 def qt_editor_class(iname, shape=None, preferred=None):
+    return _qt_editor_class_and_shape(iname, shape, preferred)[0]
+
+
+def _qt_editor_class_and_shape(iname, shape=None, preferred=None):
+    """
+    :return: widget class and shape it has been selected for (None if selected by name)
+    """
     iname = interface_name(iname)
+    key = (iname, _as_key(shape), _as_key(preferred))
+    try:
+        return _QT_EDITOR_CLASS_CACHE[key]
+    except KeyError:
+        found = _QT_EDITOR_CLASS_CACHE[key] = _find_qt_editor_class(iname, shape, preferred)
+        return found
+
+
+def _find_qt_editor_class(iname, shape=None, preferred=None):
     # Get all widget plugin for "iname" interface
-    widget_plugins = qt_widget_plugins(iname)
+    widget_plugins = _qt_widget_registry().get(iname, [])
 
     # If preferred widget(s) is/are specified, try to find it
     if isinstance(preferred, str):
@@ -37,7 +88,7 @@ def qt_editor_class(iname, shape=None, preferred=None):
             for plugin in widget_plugins:
                 if preferred == plugin.name:
                     widget_class = plugin.implementation
-                    return widget_class
+                    return widget_class, None
 
     # No preferred widget specified or preferred widget not found.
     # We try to find a widget corresponding to shapes
@@ -52,9 +103,8 @@ def qt_editor_class(iname, shape=None, preferred=None):
         for plugin in widget_plugins:
             if shape in plugin.edit_shape or 'responsive' in plugin.edit_shape:
                 widget_class = plugin.implementation
-                widget_class.shape = shape
-                return widget_class
-    return None
+                return widget_class, shape
+    return None, None
 
 
 def widget(iname, value, shape=None, preferred=None):
@@ -88,10 +138,9 @@ def qt_dialog(control=None, **kwds):
 def qt_editor(control, shape=None, preferred=None, **kwds):
     if preferred is None and control.widget:
         preferred = control.widget
-    widget_class = qt_editor_class(control.interface, shape, preferred)
-    # TODO: FIX THIS HACK
-    if hasattr(widget_class, 'shape'):
-        shape = widget_class.shape
+    widget_class, found_shape = _qt_editor_class_and_shape(control.interface, shape, preferred)
+    if found_shape is not None:
+        shape = found_shape
 
     if widget_class:
         widget = None
@@ -125,20 +174,27 @@ def qt_viewer(control, shape=None):
 
 def qt_painter(control, shape=None, preferred=None):
     cname = control.interface.__class__.__name__
-    widget_plugins = qt_widget_plugins(cname)
-    widget_class = None
+    key = (cname, preferred or None)
+    try:
+        plugin = _QT_PAINTER_PLUGIN_CACHE[key]
+    except KeyError:
+        plugin = _QT_PAINTER_PLUGIN_CACHE[key] = _find_qt_painter_plugin(cname, preferred)
+    if plugin is not None:
+        return plugin.implementation.paint(control, shape)
+
+
+def _find_qt_painter_plugin(cname, preferred=None):
+    widget_plugins = _qt_widget_registry().get(cname, [])
     if preferred:
         # Load widget specified with control
         for plugin in widget_plugins:
             if preferred == plugin.name and plugin.paint:
-                widget_class = plugin.implementation
-                return widget_class.paint(control, shape)
+                return plugin
 
     # Load first editor
     for plugin in widget_plugins:
         if plugin.paint:
-            widget_class = plugin.implementation
-            return widget_class.paint(control, shape)
+            return plugin
 
 
 def edit(control):
@@ -158,17 +214,11 @@ def qt_widget_plugins(iname=None):
     """
     if iname is None, returns {'iname':[widget_plugin1, widget_plugin2, ...]}
     else: returns widget plugins for interface iname
+
+    Plugins are discovered once, see :func:`reload_qt_controls` to take new plugins into account.
     """
+    registry = _qt_widget_registry()
     if iname is None:
-        plugins = discover_qt_controls()
-        widget_plugins = {}
-        for plugin in plugins:
-            for iname in plugin.controls:
-                widget_plugins.setdefault(iname, []).append(plugin)
-        return widget_plugins
+        return dict((name, list(widget_plugins)) for name, widget_plugins in registry.iteritems())
     else:
-        widget_plugins = qt_widget_plugins()
-        try:
-            return widget_plugins[iname]
-        except KeyError:
-            return []
+        return list(registry.get(iname, []))
@@ -19,8 +19,9 @@
 __license__ = "CeCILL V2"
 __revision__ = " $Id: shell.py 3672 2012-12-05 12:28:19Z jcoste $"
 
+import re
 import sys
-from streamredirection import GraphicalStreamRedirection
+from streamredirection import GraphicalStreamRedirection, BufferedRedirection
 
 from openalea.vpltk.qt import QtGui, QtCore
 from openalea.vpltk.check.ipython import has_ipython
@@ -55,8 +56,16 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
     problem by interfacing the Python interpreter to a PyQt widget.
 
     This class is inspired by PyCute.py : http://gerard.vermeulen.free.fr (GPL)
+
+    Output written to stdout and stderr, from any thread, is buffered by one
+    BufferedRedirection shared by both streams (so their order is kept) and inserted
+    by chunks, at most once every *frame_interval* milliseconds.
+    Only the last *max_lines* lines are kept.
     """
 
+    frame_interval = 40
+    max_lines = 10000
+
     def __init__(self, interpreter, message="", log='', parent=None):
         """Constructor.
         @param interpreter : InteractiveInterpreter in which
@@ -73,7 +82,13 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
         """
 
         QtGui.QTextEdit.__init__(self, parent)
-        GraphicalStreamRedirection.__init__(self)
+
+        self._output_format = QtGui.QTextCharFormat()
+        self._output_format.setForeground(QtGui.QBrush(QtGui.QColor(0, 0, 0)))
+        self.set_max_lines(self.max_lines)
+
+        output = BufferedRedirection(self, max_latency=self.frame_interval / 1000., buffer_gui_writes=True)
+        GraphicalStreamRedirection.__init__(self, output, output)
 
         self.interpreter = interpreter
         self.colorizer = SyntaxColor()
@@ -181,10 +196,18 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
 
 
 
+    def set_max_lines(self, max_lines):
+        """
+        Discard oldest lines when output exceeds *max_lines* lines (None: no limit).
+        """
+        self.max_lines = max_lines
+        self.document().setMaximumBlockCount(max_lines or 0)
+
     def readline(self):
         """
         Simulate stdin, stdout, and stderr.
         """
+        self.flush_output()
         self.reading = 1
         self.__clearLine()
         self.moveCursor(QtGui.QTextCursor.End)
@@ -199,26 +222,28 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
     def write(self, text):
         """
         Simulate stdin, stdout, and stderr.
+        Output buffered by stdout and stderr is inserted before *text*.
         """
+        self.flush_output()
+        if self.max_lines and text.count('\n') > self.max_lines:
+            # Older lines would be discarded anyway
+            text = '\n'.join(text.rsplit('\n', self.max_lines)[1:])
+
         # The output of self.append(text) contains to many newline characters,
         # so work around QtGui.QTextEdit's policy for handling newline characters.
-
         cursor = self.textCursor()
-
         cursor.movePosition(QtGui.QTextCursor.End)
-
-        pos1 = cursor.position()
-        cursor.insertText(text)
+        cursor.insertText(text, self._output_format)
 
         self.cursor_pos = cursor.position()
         self.setTextCursor(cursor)
-        self.ensureCursorVisible ()
+        self.ensureCursorVisible()
 
-        # Set the format
-        cursor.setPosition(pos1, QtGui.QTextCursor.KeepAnchor)
-        format = cursor.charFormat()
-        format.setForeground(QtGui.QBrush(QtGui.QColor(0, 0, 0)))
-        cursor.setCharFormat(format)
+    def flush_output(self):
+        """
+        Insert output buffered by stdout and stderr now.
+        """
+        self.stdout.deliver()
 
 
     def writelines(self, text):
@@ -277,6 +302,7 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
         """
         Insert text at the current cursor position.
         """
+        self.flush_output()
 
         self.line.insert(self.point, text)
         self.point += text.length()
@@ -290,6 +316,7 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
         """
         Handle user input a key at a time.
         """
+        self.flush_output()
         text = e.text()
         key = e.key()
 
@@ -407,27 +434,25 @@ class PyCutExt(QtGui.QTextEdit, GraphicalStreamRedirection):
         """ Color the current line """
 
         cursor = self.textCursor()
-        cursor.movePosition(QtGui.QTextCursor.StartOfLine)
-
-        newpos = cursor.position()
-        pos = -1
-
-        while(newpos != pos):
-            cursor.movePosition(QtGui.QTextCursor.NextWord)
-
-            pos = newpos
-            newpos = cursor.position()
-
-            cursor.select(QtGui.QTextCursor.WordUnderCursor)
-            word = str(cursor.selectedText ().toAscii())
-
-            if(not word) : continue
-
-            (R, G, B) = self.colorizer.get_color(word)
-
-            format = cursor.charFormat()
-            format.setForeground(QtGui.QBrush(QtGui.QColor(R, G, B)))
+        block = cursor.block()
+        start = max(block.position(), min(self.cursor_pos, block.position() + block.length() - 1))
+        line = unicode(block.text())[start - block.position():]
+
+        # Reset whole line once, then color words that need it
+        cursor.beginEditBlock()
+        cursor.setPosition(start)
+        cursor.movePosition(QtGui.QTextCursor.EndOfBlock, QtGui.QTextCursor.KeepAnchor)
+        cursor.setCharFormat(self._output_format)
+        for match in re.finditer(r'\w+', line, re.UNICODE):
+            color = self.colorizer.get_color(match.group())
+            if color == (0, 0, 0):
+                continue
+            format = QtGui.QTextCharFormat()
+            format.setForeground(QtGui.QBrush(QtGui.QColor(*color)))
+            cursor.setPosition(start + match.start())
+            cursor.setPosition(start + match.end(), QtGui.QTextCursor.KeepAnchor)
             cursor.setCharFormat(format)
+        cursor.endEditBlock()
 
 
         # Drag and Drop support
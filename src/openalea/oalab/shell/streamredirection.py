@@ -17,9 +17,13 @@
 
 
 import sys
+import threading
+import time
+from collections import deque
 from openalea.vpltk import qt
 
 RedirectionEventId = qt.QtCore.QEvent.User + 100
+BufferedRedirectionEventId = qt.QtCore.QEvent.User + 101
 sys_stderr = None
 sys_stdout = None
 sys_stdin = None
@@ -81,6 +85,120 @@ class ThreadedRedirection(object):
         pass
 
 
+class BufferedRedirection(ThreadedRedirection):
+
+    """
+    Threaded redirection merging writes of background threads into frames.
+
+    Text written from other threads is stored in a buffer. At most one frame is delivered
+    to gui stream every *max_latency* seconds, so a write is displayed at most *max_latency*
+    seconds later (if gui event loop is free).
+    If buffer exceeds *max_size* characters, oldest text is dropped.
+    Writes from gui thread are forwarded directly, after pending text, except if
+    *buffer_gui_writes* is True: they are then buffered and delivered by frames too.
+    """
+
+    def __init__(self, guistream, max_latency=0.05, max_size=1000000, buffer_gui_writes=False):
+        ThreadedRedirection.__init__(self, guistream)
+        self.max_latency = max_latency
+        self.max_size = max_size
+        self.buffer_gui_writes = buffer_gui_writes
+
+        self._lock = threading.Lock()
+        self._chunks = deque()
+        self._size = 0
+        self._pending = False
+        self._dropped_since_frame = 0
+        self._last_frame = 0
+
+        self.writes = 0
+        self.frames = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def write(self, txt):
+        """ Emulate write function """
+        txt = str(txt)
+        if not self.buffer_gui_writes and self.guistream.thread() == qt.QtCore.QThread.currentThread():
+            self.deliver()
+            self.guistream.write(txt)
+            return
+
+        with self._lock:
+            self.writes += 1
+            self._chunks.append(txt)
+            self._size += len(txt)
+            if self.max_size is not None:
+                self._drop_oldest()
+            if self._pending:
+                self.coalesced += 1
+                return
+            self._pending = True
+
+        e = qt.QtCore.QEvent(qt.QtCore.QEvent.Type(BufferedRedirectionEventId))
+        e.redirection = self
+        qt.QtGui.QApplication.postEvent(self.guistream, e)
+
+    def _drop_oldest(self):
+        # lock must be acquired
+        while self._size > self.max_size:
+            excess = self._size - self.max_size
+            chunk = self._chunks[0]
+            if len(chunk) <= excess:
+                self._chunks.popleft()
+                dropped = len(chunk)
+            else:
+                self._chunks[0] = chunk[excess:]
+                dropped = excess
+            self._size -= dropped
+            self.dropped += dropped
+            self._dropped_since_frame += dropped
+
+    def frame_requested(self):
+        """
+        Called in gui thread when a frame has been requested.
+        Deliver buffer now or when *max_latency* has elapsed since previous frame.
+        """
+        delay = self.max_latency - (time.time() - self._last_frame)
+        if delay > 0:
+            qt.QtCore.QTimer.singleShot(int(delay * 1000), self.deliver)
+        else:
+            self.deliver()
+
+    def deliver(self):
+        """ Write buffered text to gui stream. Must be called in gui thread """
+        with self._lock:
+            if not self._chunks:
+                self._pending = False
+                return
+            txt = ''.join(self._chunks)
+            self._chunks.clear()
+            self._size = 0
+            self._pending = False
+            dropped, self._dropped_since_frame = self._dropped_since_frame, 0
+            self.frames += 1
+        self._last_frame = time.time()
+        if dropped:
+            txt = '\n[... %d characters of output dropped ...]\n' % dropped + txt
+        self.guistream.write(txt)
+
+    def pending(self):
+        """ Return number of characters waiting to be delivered """
+        with self._lock:
+            return self._size
+
+    def stats(self):
+        """
+        Return dict with number of writes, frames delivered, writes coalesced into a
+        pending frame and characters dropped.
+        """
+        return dict(writes=self.writes, frames=self.frames, coalesced=self.coalesced, dropped=self.dropped)
+
+    def flush(self):
+        if self.guistream.thread() == qt.QtCore.QThread.currentThread():
+            self.deliver()
+
+
 class GraphicalStreamRedirection(object):
 
     """ Redirection of a stream as graphic output """
@@ -103,6 +221,13 @@ class GraphicalStreamRedirection(object):
 
         sys.stdout = self.stdout
 
+    def customEvent(self, event):
+        """ Display text sent by ThreadedRedirection and BufferedRedirection """
+        if event.type() == RedirectionEventId:
+            self.write(event.txt)
+        elif event.type() == BufferedRedirectionEventId:
+            event.redirection.frame_requested()
+
     def __del__(self):
         sys.stdout = self.sys_stdout
         sys.stderr = self.sys_stderr
@@ -19,7 +19,9 @@
 
 __all__ = ['qicon']
 
+import os
 import pickle
+from collections import OrderedDict
 import openalea.oalab
 from openalea.vpltk.qt import QtGui, QtCore
 from openalea.vpltk.qt.compat import orientation_qt, orientation_int
@@ -36,16 +38,101 @@ def get_shared_data(filename):
     return shared_data(openalea.oalab, filename)
 
 
-def qicon(filename, default=None, paths=None, save_filepath=None, packages=None):
+class IconCache(object):
+
+    """
+    Cache of QIcon keyed by icon request (path, search paths, size, file modification time).
+    Least recently used icons are discarded when estimated pixmap memory exceeds *max_bytes*.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._icons = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            icon, nbytes = self._icons.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._icons[key] = (icon, nbytes)
+        self.hits += 1
+        return QtGui.QIcon(icon)
+
+    def add(self, key, icon, size):
+        nbytes = size[0] * size[1] * 4
+        if key in self._icons:
+            self._bytes -= self._icons.pop(key)[1]
+        self._icons[key] = (QtGui.QIcon(icon), nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and self._icons:
+            self._bytes -= self._icons.popitem(last=False)[1][1]
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        while self._bytes > self.max_bytes and self._icons:
+            self._bytes -= self._icons.popitem(last=False)[1][1]
+
+    def clear(self):
+        self._icons.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        return dict(hits=self.hits, misses=self.misses, size=len(self._icons),
+                    bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+icon_cache = IconCache()
+
+
+def _tuple(lst):
+    if lst is None:
+        return None
+    return tuple(lst)
+
+
+def _mtime(filename):
+    # Files rewritten on disk (see save_filepath) must not be served from cache
+    try:
+        return os.path.getmtime(filename)
+    except (OSError, TypeError, UnicodeError):
+        return None
+
+
+def qicon(filename, default=None, paths=None, save_filepath=None, packages=None, size=None):
+    """
+    Return icon corresponding to *filename*, scaled to *size* (default DEFAULT_SCALE).
+
+    Icons are cached (see :data:`icon_cache`), except if *save_filepath* is specified.
+    If *filename* is a file path, icon is read again when file is modified.
+    """
     if isinstance(filename, QtGui.QIcon):
         return filename
+    if size is None:
+        size = DEFAULT_SCALE
+    if save_filepath:
+        return _qicon(filename, default, paths, save_filepath, packages, size)
+
+    key = (filename, default, _tuple(paths), _tuple(packages), tuple(size), _mtime(filename))
+    icon = icon_cache.get(key)
+    if icon is None:
+        icon = _qicon(filename, default, paths, save_filepath, packages, size)
+        icon_cache.add(key, icon, size)
+    return icon
+
 
+def _qicon(filename, default=None, paths=None, save_filepath=None, packages=None, size=DEFAULT_SCALE):
     if not filename:
         if default is None:
             default = get_shared_data('icons/oxygen_application-x-desktop.png')
-        return qicon(default, default, save_filepath=save_filepath)
+        return qicon(default, default, save_filepath=save_filepath, size=size)
     elif filename.startswith(':/'):
-        pixmap = QtGui.QPixmap(filename).scaled(*DEFAULT_SCALE, aspectRatioMode=QtCore.Qt.KeepAspectRatio)
+        pixmap = QtGui.QPixmap(filename).scaled(*size, aspectRatioMode=QtCore.Qt.KeepAspectRatio)
         icon = QtGui.QIcon(pixmap)
         if save_filepath:
             icon.addFile(save_filepath)
@@ -56,14 +143,25 @@ def qicon(filename, default=None, paths=None, save_filepath=None, packages=None)
             packages = [openalea.core, openalea.oalab]
         found = icon_path(filename, default=default, paths=paths, packages=packages)
         if found:
-            pixmap = QtGui.QPixmap(found).scaled(*DEFAULT_SCALE, aspectRatioMode=QtCore.Qt.KeepAspectRatio)
+            pixmap = QtGui.QPixmap(found).scaled(*size, aspectRatioMode=QtCore.Qt.KeepAspectRatio)
             icon = QtGui.QIcon(pixmap)
             if save_filepath:
                 icon.addFile(save_filepath)
                 pixmap.save(save_filepath)
             return icon
         else:
-            return qicon(":/images/resources/%s" % filename, save_filepath=save_filepath)
+            return qicon(":/images/resources/%s" % filename, save_filepath=save_filepath, size=size)
+
+
+def qicon_cache_info():
+    """
+    :return: dict with icon cache hits, misses, size (number of icons), bytes and max_bytes
+    """
+    return icon_cache.info()
+
+
+def clear_qicon_cache():
+    icon_cache.clear()
 
 
 def obj_icon(obj_lst, rotation=0, size=(64, 64), default=None, paths=None, save_filepath=None, packages=None):
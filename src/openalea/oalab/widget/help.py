@@ -113,6 +113,8 @@ class HelpWidget(QtGui.QTextBrowser):
         dialog = ModalDialog(preferences)
         if dialog.exec_():
             preferences.update_config(save=True)
+            from openalea.oalab.editor.text_editor import editor_settings
+            editor_settings().reload()
             # preferences.close()
 
     def mainMenu(self):
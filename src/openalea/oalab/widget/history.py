@@ -16,6 +16,7 @@
 #
 ###############################################################################
 __revision__ = ""
+from collections import deque
 from openalea.vpltk.qt import QtGui, QtCore
 from openalea.oalab.editor.highlight import Highlighter
 import resources_rc  # do not remove this import else icon are not drawn
@@ -25,10 +26,19 @@ class HistoryWidget(QtGui.QTextBrowser):
 
     """
     Widget which permit to display history
+
+    Entries are appended at the end of document, so cost of an append only depends on entry size.
+    If *max_entries* or *max_chars* are set, oldest entries are discarded to respect these limits.
     """
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, max_entries=None, max_chars=None):
         super(HistoryWidget, self).__init__(parent=parent)
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        # (number of blocks, number of characters) of each entry, oldest first
+        self._entries = deque()
+        self._size = 0
+        self._last = None
         Highlighter(self)
         self.setAccessibleName("HistoryWidget")
         self.setText("")
@@ -43,6 +53,9 @@ class HistoryWidget(QtGui.QTextBrowser):
         Remove existing history
         """
         self.setText("")
+        self._entries.clear()
+        self._size = 0
+        self._last = None
 
     def actions(self):
         return self._actions
@@ -56,14 +69,42 @@ class HistoryWidget(QtGui.QTextBrowser):
 
         :param txt: text to add in history
         """
-        previous_txt = self.toPlainText()
-        if previous_txt:
-            # Check if previous line is not the same as the new one
-            if previous_txt.splitlines()[-1] != txt:
-                txt = previous_txt + "\n" + txt
-            else:
-                txt = previous_txt
-        self.setText(txt)
+        # Check if previous entry is not the same as the new one
+        if txt == self._last:
+            return
+        self._last = txt
+
+        cursor = QtGui.QTextCursor(self.document())
+        cursor.movePosition(QtGui.QTextCursor.End)
+        if self._entries:
+            cursor.insertText("\n" + txt)
+        else:
+            cursor.insertText(txt)
+        size = len(txt) + 1
+        self._entries.append((txt.count("\n") + 1, size))
+        self._size += size
+        self._discard_oldest()
+
+    def set_max_entries(self, max_entries):
+        self.max_entries = max_entries
+        self._discard_oldest()
+
+    def set_max_chars(self, max_chars):
+        self.max_chars = max_chars
+        self._discard_oldest()
+
+    def _discard_oldest(self):
+        while len(self._entries) > 1 and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_chars is not None and self._size > self.max_chars)):
+            nblocks, size = self._entries.popleft()
+            self._size -= size
+            cursor = QtGui.QTextCursor(self.document())
+            cursor.movePosition(QtGui.QTextCursor.Start)
+            # Select entry and its trailing line separator
+            position = self.document().findBlockByNumber(nblocks).position()
+            cursor.setPosition(position, QtGui.QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
 
     def initialize(self):
         from openalea.oalab.service.history import register_history_displayer
@@ -20,6 +20,7 @@
 
 import json
 import sys
+import time
 import weakref
 
 import openalea.core
@@ -40,6 +41,23 @@ from openalea.oalab.about import About
 from openalea.oalab.pluginwidget.explorer import PluginExplorer
 from openalea.oalab.utils import ModalDialog
 
+# list of (applet name, creation time in seconds, deferred), see startup_report
+_applet_creation_times = []
+
+
+def startup_report():
+    """
+    Return a text report of time spent to create each applet.
+    Applets created on first display (deferred mode) are marked with "*".
+    """
+    lines = []
+    total = 0
+    for name, duration, deferred in _applet_creation_times:
+        total += duration
+        lines.append('  %-25s %8.3f s%s' % (name, duration, ' *' if deferred else ''))
+    lines.append('  %-25s %8.3f s' % ('Total', total))
+    return '\n'.join(lines)
+
 
 def menu_actions(widget):
     actions = []
@@ -325,6 +343,10 @@ class AppletTabWidget(QtGui.QTabWidget):
         # dict: idx -> name of current applet
         self._name = {}
 
+        # dict: idx -> (name, properties) of applets not yet created, see set_deferred_applet
+        self._deferred = {}
+        self.currentChanged.connect(self._create_deferred_applet)
+
         # Set in edit mode by default
         self.set_edit_mode()
         self.fine_tune()
@@ -355,8 +377,12 @@ class AppletTabWidget(QtGui.QTabWidget):
         return rvalue
 
     def _on_tab_moved(self, old, new):
-        self._name[old], self._name[new] = self._name[new], self._name[old]
-        self._applets[old], self._applets[new] = self._applets[new], self._applets[old]
+        for dic in (self._name, self._applets, self._deferred):
+            old_value, new_value = dic.pop(old, None), dic.pop(new, None)
+            if old_value is not None:
+                dic[new] = old_value
+            if new_value is not None:
+                dic[old] = new_value
         self._redraw_tab(old)
         self._redraw_tab(new)
 
@@ -394,6 +420,7 @@ class AppletTabWidget(QtGui.QTabWidget):
                 del applet
             del self._applets[idx]
             del self._name[idx]
+        self._deferred.pop(idx, None)
         self.removeTab(idx)
 
     def user_set_applet(self, name):
@@ -403,7 +430,29 @@ class AppletTabWidget(QtGui.QTabWidget):
         if hasattr(applet, 'initialize'):
             applet.initialize()
 
-    def set_applet(self, name, properties=None):
+    def set_deferred_applet(self, name, properties=None):
+        """
+        Associate applet "name" to current tab but create it only when tab is displayed.
+        """
+        idx = self.currentIndex()
+        self._deferred[idx] = (name, properties)
+        pl = plugin(name, 'oalab.applet')
+        self.setTabIcon(idx, obj_icon([pl]))
+        self.setTabToolTip(idx, pl.label)
+
+    def is_deferred(self, name):
+        return name in [deferred[0] for deferred in self._deferred.values()]
+
+    def _create_deferred_applet(self, idx):
+        if idx not in self._deferred:
+            return
+        name, properties = self._deferred.pop(idx)
+        self.set_applet(name, properties=properties, deferred=True)
+        applet = self.currentApplet()
+        if hasattr(applet, 'initialize'):
+            applet.initialize()
+
+    def set_applet(self, name, properties=None, deferred=False):
         """
         Show applet "name" in current tab.
         """
@@ -425,10 +474,16 @@ class AppletTabWidget(QtGui.QTabWidget):
             # If applet has never been instantiated in the whole application,
             # we instantiate it as the "main" instance (ie reachable thanks to plugin_instance)
             # else, just create a new one.
+            # For deferred applets, main instance may have been created by another applet
+            # before being displayed. In this case, we reuse it.
+            t0 = time.time()
             if plugin_instance_exists('oalab.applet', name):
-                applet = new_plugin_instance('oalab.applet', name)
+                applet = plugin_instance('oalab.applet', name)
+                if not deferred or applet is None or applet.parent() is not None:
+                    applet = new_plugin_instance('oalab.applet', name)
             else:
                 applet = plugin_instance('oalab.applet', name)
+            _applet_creation_times.append((name, time.time() - t0, deferred))
 
             if applet is None:
                 return
@@ -500,7 +555,13 @@ class AppletTabWidget(QtGui.QTabWidget):
     def _repr_json_(self):
         applets = []
         for idx in range(self.count()):
-            if idx in self._name:
+            if idx in self._deferred:
+                name, properties = self._deferred[idx]
+                d = dict(name=name)
+                if properties:
+                    d['properties'] = properties
+                applets.append(d)
+            elif idx in self._name:
                 name = self._name[idx]
                 applet_frame = self.widget(idx)
                 properties = applet_frame.properties()
@@ -519,6 +580,9 @@ class AppletTabWidget(QtGui.QTabWidget):
 class AppletContainer(QtGui.QWidget):
     appletSet = QtCore.Signal(object, object)
 
+    # If True, only applets in current tabs are created at startup, others are created on first display
+    DEFERRED_APPLETS = False
+
     def __init__(self, parent=None):
         QtGui.QWidget.__init__(self, None)
 
@@ -636,7 +700,9 @@ class AppletContainer(QtGui.QWidget):
 
     def emit_applet_set(self):
         for applet in self._applets:
-            self.appletSet.emit(None, applet)
+            # deferred applets emit appletSet when created
+            if not self._tabwidget.is_deferred(applet):
+                self.appletSet.emit(None, applet)
 
     def closeEvent(self, event):
         if self._tabwidget.close():
@@ -657,7 +723,10 @@ class AppletContainer(QtGui.QWidget):
             properties = applet.get('properties', {})
             if i:
                 self._tabwidget.new_tab()
-            self._tabwidget.set_applet(name, properties=properties)
+            if i and self.DEFERRED_APPLETS:
+                self._tabwidget.set_deferred_applet(name, properties=properties)
+            else:
+                self._tabwidget.set_applet(name, properties=properties)
             self._tabwidget.currentWidget().set_properties(properties)
         self._tabwidget.setCurrentIndex(0)
         self._applets = names
@@ -801,6 +870,7 @@ class OALabSplittableUi(SplittableUI):
         self._g = OABinaryTree()
         # -- contains geometry information (a vid->QRect mapping) --
         self._geomCache = {}
+        self._init_geom_scheduler()
         # -- initialising the pane at level 0 --
         self._geomCache[0] = self.contentsRect()
         self._install_child(0, content)
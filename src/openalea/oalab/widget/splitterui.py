@@ -444,6 +444,10 @@ class SplittableUI(QtGui.QWidget):
     # of the vertices in the binary tree will be serialized
     reprProps = ["amount", "splitDirection"]
 
+    # If True, geometry updates requested by resize events and splitter drags
+    # are merged and computed once, when control returns to event loop.
+    COALESCE_GEOMETRY = True
+
     widgetMenuRequest = QtCore.Signal(QtCore.QPoint, int)
     dragEnterEventTest = QtCore.Signal(object, QtGui.QDragEnterEvent)
     dropHandlerRequest = QtCore.Signal(object, int, QtGui.QDropEvent)
@@ -461,10 +465,19 @@ class SplittableUI(QtGui.QWidget):
         self._g = BinaryTree()
         # -- contains geometry information (a vid->QRect mapping) --
         self._geomCache = {}
+        self._init_geom_scheduler()
         # -- initialising the pane at level 0 --
         self._geomCache[0] = self.contentsRect()
         self._install_child(0, content)
 
+    def _init_geom_scheduler(self):
+        # -- nodes whose geometry must be recomputed at next event loop iteration --
+        self._pendingGeoms = set()
+        self._geomTimer = QtCore.QTimer(self)
+        self._geomTimer.setSingleShot(True)
+        self._geomTimer.setInterval(0)
+        self._geomTimer.timeout.connect(self.flushGeoms)
+
     def leaves(self):
         return self._g.leaves()
 
@@ -577,12 +590,45 @@ class SplittableUI(QtGui.QWidget):
         self.computeGeoms(paneId)
         return widget
 
-    def computeGeoms(self, baseNode=0):
+    def computeGeoms(self, baseNode=0, force=True):
         """Recompute all the geometry starting at node `baseNode`.
-        It is effectively hierarchical."""
-        visitor = self.GeometryComputingVisitor(self._g, self._geomCache)
+        It is effectively hierarchical.
+        If `force` is False, subtrees whose geometry did not change are skipped."""
+        visitor = self.GeometryComputingVisitor(self._g, self._geomCache, force)
         self._g.visit_i_breadth_first(visitor, baseNode)
 
+    def scheduleGeoms(self, baseNode=0):
+        """Request geometry computation of subtree `baseNode`.
+        Requests are merged and done once control returns to event loop,
+        see COALESCE_GEOMETRY."""
+        if not self.COALESCE_GEOMETRY:
+            self.computeGeoms(baseNode)
+            return
+        self._pendingGeoms.add(baseNode)
+        if not self._geomTimer.isActive():
+            self._geomTimer.start()
+
+    def flushGeoms(self):
+        """Compute geometries requested with scheduleGeoms.
+        Subtrees included in another requested subtree are computed only once."""
+        self._geomTimer.stop()
+        pending, self._pendingGeoms = self._pendingGeoms, set()
+        g = self._g
+        roots = {}
+        for vid in pending:
+            if vid not in g:
+                continue
+            root, parent = vid, g.parent(vid)
+            while parent is not None:
+                if parent in pending:
+                    root = parent
+                parent = g.parent(parent)
+            # A root also covering other requested subtrees is forced,
+            # else these subtrees are skipped if root geometry did not change
+            roots[root] = roots.get(root, False) or root != vid
+        for vid, force in roots.iteritems():
+            self.computeGeoms(vid, force=force)
+
     def getContentAt(self, paneId):
         if self._g.has_property(paneId, "widget"):
             wid = self._g.get_property(paneId, "widget")
@@ -774,7 +820,7 @@ class SplittableUI(QtGui.QWidget):
 
         self.__sticky_check(paneId, orientation, newAmount)
         self._g.set_property(paneId, "amount", newAmount)
-        self.computeGeoms(paneId)
+        self.scheduleGeoms(paneId)
 
     def _onWidgetMenuRequest(self, point):
         pt = self.mapFromGlobal(point)
@@ -805,9 +851,9 @@ class SplittableUI(QtGui.QWidget):
     # Qt Event reimplementations #
     ##############################
     def resizeEvent(self, event):
-        """Reimplemented to call `computeGeoms`."""
+        """Reimplemented to call `scheduleGeoms`."""
         self._geomCache[0] = self.contentsRect()
-        self.computeGeoms(baseNode=0)
+        self.scheduleGeoms(baseNode=0)
         QtGui.QWidget.resizeEvent(self, event)
 
     def dragEnterEvent(self, event):
@@ -853,9 +899,10 @@ class SplittableUI(QtGui.QWidget):
         the partitioning of the UI and computes the geometries
         of the children widgets"""
 
-        def __init__(self, graph, geomCache):
+        def __init__(self, graph, geomCache, force=True):
             self.g = graph
             self.geomCache = geomCache
+            self.force = force
 
         def layout_pane(self, geom, vid, widgetSpace=None):
             widget = None
@@ -946,10 +993,14 @@ class SplittableUI(QtGui.QWidget):
             firstGeom = QtCore.QRect(firstX, firstY, firstWidth, firstHeight)
             secondGeom = QtCore.QRect(secondX, secondY, secondWidth, secondHeight)
 
+            # -- if not forced, children whose geometry did not change are not laid out again --
+            ignoreFirst = not self.force and self.geomCache.get(fid) == firstGeom
+            ignoreSecond = not self.force and self.geomCache.get(sid) == secondGeom
+
             self.geomCache[fid] = firstGeom
             self.geomCache[sid] = secondGeom
             handle.setGeometry(hgeom)
-            return False, False  # don't ignore first or second child
+            return ignoreFirst, ignoreSecond
 
     class PaneIdFindingVisitor(object):
 
@@ -74,20 +74,32 @@ class WorldBrowser(GenericWorldBrowser, AbstractListener):
 
     def notify(self, sender, event=None):
         signal, data = event
-        # print signal
+        # Only rows of modified objects are updated, see WorldModel
         if signal == 'world_changed':
-            self.set_world(data)
-            self.refresh()
+            if data is self.world:
+                self.model.update_world(data)
+            else:
+                self.set_world(data)
+                self.refresh()
         elif signal == 'world_object_removed':
-            world = data[0]
-            self.set_world(world)
-            self.refresh()
+            world, old_object = data[:2]
+            if world is self.world:
+                self.model.remove_world_object(old_object.name)
+            else:
+                self.set_world(world)
+                self.refresh()
         elif signal == 'world_object_changed':
-            world = data[0]
-            self.set_world(world)
-            self.refresh()
+            world, old_object, world_object = data
+            if world is self.world:
+                if old_object is not None and old_object.name != world_object.name:
+                    self.model.remove_world_object(old_object.name)
+                self.model.set_world_object(world_object.name, world_object)
+            else:
+                self.set_world(world)
+                self.refresh()
         elif signal == 'world_sync':
-            self.refresh()
+            if self.world is not None:
+                self.model.update_world(self.world)
 
     def show_world_object(self, index):
         item = index.model().itemFromIndex(index)
@@ -117,17 +129,49 @@ class WorldBrowser(GenericWorldBrowser, AbstractListener):
 
 
 class WorldModel(QtGui.QStandardItemModel):
+    """
+    Flat model listing world objects and their types.
+
+    :meth:`set_world` rebuilds all rows whereas :meth:`update_world`, :meth:`set_world_object`
+    and :meth:`remove_world_object` only touch rows that differ, so views keep their
+    selection and expansion state.
+    """
+
+    def __init__(self, *args, **kwargs):
+        QtGui.QStandardItemModel.__init__(self, *args, **kwargs)
+        self._items = {}
 
     def set_world(self, world={}):
         self.clear()
-        parentItem = self.invisibleRootItem()
+        self._items = {}
         self.setHorizontalHeaderLabels(["World Objects", "Type"])
-        world_objects = world.keys()
-        for world_object in world_objects:
-            item1 = QtGui.QStandardItem(world_object)
-            objtype = type(world[world_object].obj).__name__
-            item2 = QtGui.QStandardItem(str(objtype))
-            parentItem.appendRow([item1, item2])
+        for world_object in world.keys():
+            self.set_world_object(world_object, world[world_object])
+
+    def update_world(self, world={}):
+        if self.columnCount() == 0:
+            self.setHorizontalHeaderLabels(["World Objects", "Type"])
+        for name in set(self._items) - set(world.keys()):
+            self.remove_world_object(name)
+        for name in world.keys():
+            self.set_world_object(name, world[name])
+
+    def set_world_object(self, name, world_object):
+        objtype = str(type(world_object.obj).__name__)
+        if name in self._items:
+            type_item = self.item(self._items[name].row(), 1)
+            if type_item.text() != objtype:
+                type_item.setText(objtype)
+        else:
+            item1 = QtGui.QStandardItem(name)
+            item2 = QtGui.QStandardItem(objtype)
+            self.invisibleRootItem().appendRow([item1, item2])
+            self._items[name] = item1
+
+    def remove_world_object(self, name):
+        item = self._items.pop(name, None)
+        if item is not None:
+            self.removeRow(item.row())
 
 
 class WorldControlPanel(QtGui.QWidget, AbstractListener):
@@ -0,0 +1,51 @@
+from openalea.oalab.editor.completion import DictionaryCompleter
+from openalea.oalab.testing.qtunittest import QtTestCase
+
+
+class FakeEvents(object):
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def register(self, event, callback):
+        self.callbacks.setdefault(event, []).append(callback)
+
+    def trigger(self, event):
+        for callback in self.callbacks.get(event, []):
+            callback()
+
+
+class FakeInterpreter(object):
+
+    def __init__(self):
+        self.user_ns = {}
+        self.events = FakeEvents()
+
+    def run(self, name, value):
+        self.user_ns[name] = value
+        self.events.trigger('post_execute')
+
+
+def completions(completer, prefix):
+    completer.setCompletionPrefix(prefix)
+    return [unicode(word) for word in completer._model.stringList()]
+
+
+class TestCaseCompletionNamespace(QtTestCase):
+
+    def test_interpreter_names(self):
+        interp = FakeInterpreter()
+        interp.user_ns['my_variable'] = 1
+
+        completer = DictionaryCompleter()
+        completer.set_interpreter(interp)
+        assert completions(completer, 'my_') == ['my_variable']
+
+        interp.run('my_function', len)
+        assert completions(completer, 'my_f') == ['my_function']
+
+        del interp.user_ns['my_variable']
+        interp.events.trigger('post_execute')
+        assert 'my_variable' not in completer.index
+        # static words are kept
+        assert 'import' in completer.index
@@ -0,0 +1,34 @@
+from openalea.oalab.widget.splittablewindow import AppletContainer
+from openalea.oalab.testing.qtunittest import QtTestCase
+
+
+class TestCaseDeferredApplets(QtTestCase):
+
+    def setUp(self):
+        self.init()
+        self._deferred = AppletContainer.DEFERRED_APPLETS
+        AppletContainer.DEFERRED_APPLETS = True
+
+    def tearDown(self):
+        AppletContainer.DEFERRED_APPLETS = self._deferred
+        self.finalize()
+
+    def test_applet_created_on_first_display(self):
+        self.widget = AppletContainer()
+        self.widget.add_applets([{'name': 'HelpWidget'}, {'name': 'Logger'}])
+        tabwidget = self.widget._tabwidget
+
+        # Only applet of current tab is created
+        assert tabwidget.currentIndex() == 0
+        assert tabwidget.currentAppletName() == 'HelpWidget'
+        assert 1 not in tabwidget._applets
+        assert tabwidget.is_deferred('Logger')
+
+        # Deferred applet is still saved in layout
+        names = [applet['name'] for applet in tabwidget._repr_json_()['applets']]
+        assert names == ['HelpWidget', 'Logger']
+
+        tabwidget.setCurrentIndex(1)
+        assert tabwidget.currentAppletName() == 'Logger'
+        assert 'Logger' in tabwidget._applets[1]
+        assert not tabwidget.is_deferred('Logger')
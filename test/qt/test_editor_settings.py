@@ -0,0 +1,44 @@
+from openalea.oalab.editor import text_editor
+from openalea.oalab.editor.text_editor import TextEditor, EditorSettings
+from openalea.oalab.testing.qtunittest import QtTestCase
+
+
+class TestCaseEditorSettings(QtTestCase):
+
+    def setUp(self):
+        self.init()
+        self._shared = text_editor._EDITOR_SETTINGS
+        self._settings_class = text_editor.settings.Settings
+        self.reads = []
+
+        def counting_settings(*args, **kwargs):
+            self.reads.append(1)
+            return self._settings_class(*args, **kwargs)
+
+        text_editor._EDITOR_SETTINGS = EditorSettings()
+        text_editor.settings.Settings = counting_settings
+
+    def tearDown(self):
+        text_editor.settings.Settings = self._settings_class
+        text_editor._EDITOR_SETTINGS = self._shared
+        self.finalize()
+
+    def test_settings_read_once(self):
+        editors = [TextEditor() for i in range(5)]
+        assert len(self.reads) == 1
+
+        text_editor.editor_settings().set(save=False, font_size=17)
+        for editor in editors:
+            assert editor.font().pointSize() == 17
+        assert len(self.reads) == 1
+
+    def test_closed_editor_released(self):
+        import gc
+        import weakref
+        editor = TextEditor()
+        ref = weakref.ref(editor)
+        del editor
+        gc.collect()
+        assert ref() is None
+        assert len(text_editor.editor_settings()._editors) == 0
+        text_editor.editor_settings().set(save=False, font=u'Courier')
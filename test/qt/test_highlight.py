@@ -0,0 +1,70 @@
+from openalea.vpltk.qt import QtGui
+from openalea.oalab.editor.highlight import Highlighter
+from openalea.oalab.testing.qtunittest import QtTestCase
+
+CODE = """a = 1
+s = 'abc'
+b = 2
+c = 3
+"""
+
+
+class TestCaseHighlighter(QtTestCase):
+
+    def _color(self, block, position):
+        for format_range in block.layout().additionalFormats():
+            if format_range.start <= position < format_range.start + format_range.length:
+                return format_range.format.foreground().color().name()
+
+    def _in_string(self, block):
+        return block.userData().syntax_stack[-1] != 'root'
+
+    def _replace_line(self, number, text):
+        block = self.widget.document().findBlockByNumber(number)
+        cursor = QtGui.QTextCursor(block)
+        cursor.movePosition(cursor.EndOfBlock, cursor.KeepAnchor)
+        cursor.insertText(text)
+
+    def _wait(self, highlighter):
+        self.app.processEvents()
+        while not highlighter.is_complete():
+            self.app.processEvents()
+
+    def check_multiline_string(self, highlighter):
+        document = self.widget.document()
+        block = document.findBlockByNumber(2)
+        assert not self._in_string(block)
+        name_color = self._color(block, 0)
+
+        # Open a multi-line string in middle of document: following blocks are strings
+        self._replace_line(1, 's = """abc')
+        self._wait(highlighter)
+        string_color = self._color(document.findBlockByNumber(1), 8)
+        assert string_color != name_color
+        for number in (1, 2, 3):
+            assert self._in_string(document.findBlockByNumber(number))
+        assert self._color(document.findBlockByNumber(2), 0) == string_color
+        assert self._color(document.findBlockByNumber(3), 0) == string_color
+
+        # Close it: following blocks are code again
+        self._replace_line(2, 'b = 2"""')
+        self._wait(highlighter)
+        assert self._in_string(document.findBlockByNumber(1))
+        assert not self._in_string(document.findBlockByNumber(2))
+        assert not self._in_string(document.findBlockByNumber(3))
+        assert self._color(document.findBlockByNumber(2), 0) == string_color
+        assert self._color(document.findBlockByNumber(3), 0) == name_color
+
+    def test_multiline_string(self):
+        self.widget = QtGui.QPlainTextEdit()
+        self.widget.setPlainText(CODE)
+        highlighter = Highlighter(self.widget)
+        self._wait(highlighter)
+        self.check_multiline_string(highlighter)
+
+    def test_multiline_string_incremental(self):
+        self.widget = QtGui.QPlainTextEdit()
+        self.widget.setPlainText(CODE)
+        highlighter = Highlighter(self.widget, incremental=True)
+        self._wait(highlighter)
+        self.check_multiline_string(highlighter)
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+
+from openalea.vpltk.qt import QtGui
+from openalea.oalab import utils
+from openalea.oalab.utils import IconCache, qicon
+from openalea.oalab.testing.qtunittest import QtTestCase
+
+
+class TestCaseIconCache(QtTestCase):
+
+    def setUp(self):
+        self.init()
+        self.tmpdir = tempfile.mkdtemp()
+        self._cache = utils.icon_cache
+        utils.icon_cache = IconCache()
+
+    def tearDown(self):
+        utils.icon_cache = self._cache
+        shutil.rmtree(self.tmpdir)
+        self.finalize()
+
+    def _image(self, name, color, size=(8, 8)):
+        pixmap = QtGui.QPixmap(*size)
+        pixmap.fill(QtGui.QColor(color))
+        filepath = os.path.join(self.tmpdir, name)
+        pixmap.save(filepath)
+        return filepath
+
+    def test_hits(self):
+        filepath = self._image('icon.png', 'red')
+        qicon(filepath, size=(16, 16))
+        qicon(filepath, size=(16, 16))
+        info = utils.qicon_cache_info()
+        assert info['misses'] == 1
+        assert info['hits'] == 1
+        assert info['size'] == 1
+
+    def test_size_keys(self):
+        filepath = self._image('icon.png', 'red')
+        qicon(filepath, size=(16, 16))
+        qicon(filepath, size=(32, 32))
+        qicon(filepath, size=(32, 32))
+        info = utils.qicon_cache_info()
+        assert info['misses'] == 2
+        assert info['hits'] == 1
+        assert info['bytes'] == 16 * 16 * 4 + 32 * 32 * 4
+
+    def test_modified_file(self):
+        filepath = self._image('icon.png', 'red')
+        qicon(filepath, size=(16, 16))
+
+        self._image('icon.png', 'blue')
+        mtime = os.path.getmtime(filepath) + 10
+        os.utime(filepath, (mtime, mtime))
+
+        icon = qicon(filepath, size=(16, 16))
+        assert utils.qicon_cache_info()['misses'] == 2
+        color = icon.pixmap(16, 16).toImage().pixel(0, 0)
+        assert QtGui.QColor(color) == QtGui.QColor('blue')
+
+    def test_max_bytes(self):
+        nbytes = 16 * 16 * 4
+        cache = IconCache(max_bytes=2 * nbytes)
+        for key in ('a', 'b', 'c'):
+            cache.add(key, QtGui.QIcon(), (16, 16))
+        # least recently used icon is discarded
+        assert cache.get('a') is None
+        assert cache.get('b') is not None
+        assert cache.info()['bytes'] == 2 * nbytes
+
+        # 'b' has just been used, so 'c' is discarded
+        cache.add('d', QtGui.QIcon(), (16, 16))
+        assert cache.get('c') is None
+        assert cache.get('b') is not None
+
+        cache.set_max_bytes(nbytes)
+        assert cache.info()['size'] == 1
+        assert cache.get('b') is not None
@@ -0,0 +1,32 @@
+from openalea.oalab.service import qt_control
+
+
+def test_discovery_is_cached():
+    calls = []
+    discover = qt_control.discover_qt_controls
+
+    def counting_discover():
+        calls.append(1)
+        return discover()
+
+    qt_control.discover_qt_controls = counting_discover
+    try:
+        qt_control.reload_qt_controls()
+        qt_control.qt_widget_plugins('IInt')
+        qt_control.qt_editor_class('IInt')
+        qt_control.qt_editor_class('IInt', 'hline')
+        assert len(calls) == 1
+
+        qt_control.reload_qt_controls()
+        qt_control.qt_widget_plugins('IInt')
+        assert len(calls) == 2
+    finally:
+        qt_control.discover_qt_controls = discover
+        qt_control.reload_qt_controls()
+
+
+def test_editor_class_lookup():
+    qt_control.reload_qt_controls()
+    first = qt_control.qt_editor_class('IInt', 'hline')
+    assert qt_control.qt_editor_class('IInt', ['hline']) is first
+    assert qt_control.qt_editor_class('IInt', 'hline') is first
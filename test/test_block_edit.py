@@ -0,0 +1,15 @@
+from openalea.oalab.editor.text_editor import indent_lines, dedent_lines, comment_lines, uncomment_lines
+
+
+def test_indent_dedent():
+    lines = ['def f():', '    x = 1', '', '\tif x:', '  y']
+    assert indent_lines(lines) == ['    def f():', '        x = 1', '', '    \tif x:', '      y']
+    assert dedent_lines(lines) == ['def f():', 'x = 1', '', 'if x:', 'y']
+    assert dedent_lines(indent_lines(lines, '  '), '  ') == lines
+
+
+def test_comment_uncomment():
+    lines = ['a = 1', '# b = 2', '']
+    assert comment_lines(lines) == ['#a = 1', '## b = 2', '#']
+    assert uncomment_lines(comment_lines(lines)) == lines
+    assert uncomment_lines(lines) == ['a = 1', ' b = 2', '']
@@ -0,0 +1,45 @@
+import numpy as np
+
+from openalea.oalab.colormap.colormap_utils import Colormap
+
+
+def colormap():
+    cmap = Colormap(name='test')
+    cmap.add_rgb_point(0.0, (0, 0, 0))
+    cmap.add_rgb_point(0.3, (1, 0, 0.5))
+    cmap.add_rgb_point(1.0, (1, 1, 1))
+    return cmap
+
+
+def test_get_colors_matches_get_color():
+    cmap = colormap()
+    values = np.linspace(-0.1, 1.1, 121)
+    colors = cmap.get_colors(values)
+    assert colors.shape == (121, 3)
+    for value, color in zip(values, colors):
+        assert np.allclose(color, cmap.get_color(value))
+
+
+def test_get_colors_shape_and_alpha():
+    cmap = colormap()
+    values = np.random.rand(4, 5, 6)
+    assert cmap.get_colors(values).shape == (4, 5, 6, 3)
+    rgba = cmap.get_colors(values, alpha=0.5)
+    assert rgba.shape == (4, 5, 6, 4)
+    assert np.all(rgba[..., 3] == 0.5)
+
+
+def test_lut():
+    cmap = colormap()
+    values = np.random.rand(100)
+    lut = cmap.get_colors(values, lut_resolution=4096)
+    assert np.allclose(lut, cmap.get_colors(values), atol=1e-3)
+    assert cmap.lut(4096) is cmap.lut(4096)
+
+    cmap.add_rgb_point(0.5, (0, 1, 0))
+    assert np.allclose(cmap.lut(3)[1], (0, 1, 0))
+
+
+def test_empty_colormap():
+    cmap = Colormap()
+    assert np.all(cmap.get_colors(np.random.rand(10)) == 0)
@@ -0,0 +1,23 @@
+from openalea.oalab.editor.completion import CompletionIndex
+
+
+def test_completion_index():
+    index = CompletionIndex(['def', 'del', 'for'])
+    assert index.complete('de') == ['def', 'del']
+    assert index.complete('DE') == ['def', 'del']
+
+    assert index.update_namespace({'delta': 1, 'Delta': 2, 'x': 3}) == 3
+    assert index.complete('del') == ['del', 'Delta', 'delta']
+    assert index.complete('del', limit=2) == ['del', 'Delta']
+
+    # only changed names are processed, static words are never removed
+    assert index.update_namespace(['delta', 'y', 'del']) == 3
+    assert index.complete('del') == ['del', 'delta']
+    assert 'x' not in index
+    assert 'y' in index
+
+    index.add_static(['delta'])
+    index.update_namespace([])
+    assert index.complete('del') == ['del', 'delta']
+    assert len(index) == 4
+    assert index.complete('z') == []
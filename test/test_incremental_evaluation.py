@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+
+from openalea.oalab.model.evaluation import IncrementalEvaluation, EvaluationProfile, diff_profiles
+
+
+class FakeNode(object):
+
+    def __init__(self, lazy=True):
+        self.lazy = lazy
+        self.delay = 0
+        self.modified = True
+        self.inputs = {}
+        self.evaluated = 0
+
+    def set_input(self, index, value):
+        if self.inputs.get(index) != value:
+            self.modified = True
+        self.inputs[index] = value
+
+    def get_output(self, index):
+        return sum(self.inputs.values()) + 1
+
+    def eval(self):
+        self.evaluated += 1
+        self.modified = False
+
+    def notify_listeners(self, event):
+        pass
+
+
+class FakeDataflow(object):
+
+    """
+    Chain of nodes: one output port and one input port per node, pid = 2 * vid (+1 for output)
+    """
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self._edges = edges
+
+    def vertices(self):
+        return range(len(self.nodes))
+
+    def actor(self, vid):
+        return self.nodes[vid]
+
+    def edges(self):
+        return range(len(self._edges))
+
+    def source_port(self, eid):
+        return 2 * self._edges[eid][0] + 1
+
+    def target_port(self, eid):
+        return 2 * self._edges[eid][1]
+
+    def out_neighbors(self, vid):
+        return [t for s, t in self._edges if s == vid]
+
+    def in_ports(self, vid):
+        return [2 * vid]
+
+    def connected_ports(self, pid):
+        return [2 * s + 1 for s, t in self._edges if 2 * t == pid]
+
+    def vertex(self, pid):
+        return pid // 2
+
+    def local_id(self, pid):
+        return 0
+
+
+def test_incremental_evaluation():
+    nodes = [FakeNode() for i in range(4)]
+    # 0 -> 1 -> 2, 3 is independent
+    evaluation = IncrementalEvaluation(FakeDataflow(nodes, [(0, 1), (1, 2)]))
+
+    report = evaluation.run()
+    assert report == dict(total=4, planned=4, evaluated=4, skipped=0)
+
+    report = evaluation.run()
+    assert report['evaluated'] == 0
+    assert report['skipped'] == 4
+
+    # output of 0 does not change: descendants are visited but not evaluated
+    nodes[0].modified = True
+    report = evaluation.run()
+    assert report == dict(total=4, planned=3, evaluated=1, skipped=3)
+    assert [node.evaluated for node in nodes] == [2, 1, 1, 1]
+
+    nodes[0].set_input(0, 1)
+    report = evaluation.run()
+    assert report == dict(total=4, planned=3, evaluated=3, skipped=1)
+    assert [node.evaluated for node in nodes] == [3, 2, 2, 1]
+
+    report = evaluation.run(full=True)
+    assert report['evaluated'] == 4
+
+
+def test_step_and_cycles():
+    nodes = [FakeNode() for i in range(3)]
+    evaluation = IncrementalEvaluation(FakeDataflow(nodes, [(0, 1), (1, 2)]))
+    assert evaluation.start(full=True)
+    assert evaluation.step() == 0
+    assert evaluation.step() == 1
+    assert evaluation.step() == 2
+    assert evaluation.step() is None
+
+    evaluation = IncrementalEvaluation(FakeDataflow(nodes, [(0, 1), (1, 0)]))
+    assert evaluation.acyclic() is False
+    assert evaluation.run() is None
+
+
+def test_lambda_variables():
+    from openalea.core.system.systemnodes import LambdaVar
+    nodes = [FakeNode(), LambdaVar()]
+    evaluation = IncrementalEvaluation(FakeDataflow(nodes, [(1, 0)]))
+    assert evaluation.acyclic() is True
+    assert evaluation.supported() is False
+    assert evaluation.start() is False
+    assert evaluation.run() is None
+    assert nodes[0].evaluated == 0
+
+
+def test_profile():
+    nodes = [FakeNode() for i in range(3)]
+    evaluation = IncrementalEvaluation(FakeDataflow(nodes, [(0, 1), (1, 2)]))
+    evaluation.profile = EvaluationProfile()
+    evaluation.run()
+    evaluation.run(full=True)
+    profile = evaluation.profile
+    assert sorted(profile.nodes) == ['0', '1', '2']
+    assert profile.nodes['1']['calls'] == 2
+    assert profile.total_time() >= 0
+
+    # skipped nodes are not recorded
+    nodes[0].modified = True
+    evaluation.run()
+    assert profile.nodes['0']['calls'] == 3
+    assert profile.nodes['1']['calls'] == 2
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'profile.json')
+        profile.save(path)
+        assert EvaluationProfile.load(path).nodes == profile.nodes
+
+        before = EvaluationProfile()
+        before.record(0, nodes[0], 0.5)
+        before.record(3, nodes[0], 1.)
+        diff = diff_profiles(before, path)
+    finally:
+        shutil.rmtree(tmpdir)
+    assert sorted(diff) == ['0', '1', '2', '3']
+    assert diff['0']['calls'] == 2
+    assert diff['1']['calls'] == 2
+    assert diff['3']['calls'] == -1
+    assert diff['3']['time'] == -1.
@@ -0,0 +1,35 @@
+from pygments.lexers import PythonLexer
+
+from openalea.oalab.editor import highlight
+from openalea.oalab.editor.highlight import clear_lexer_cache, get_lexer, prewarm_lexers
+
+
+def test_lexer_cache():
+    clear_lexer_cache()
+    scans = []
+    get_all_lexers = highlight.get_all_lexers
+
+    def counting_get_all_lexers():
+        scans.append(1)
+        return get_all_lexers()
+
+    highlight.get_all_lexers = counting_get_all_lexers
+    try:
+        prewarm_lexers(['model.py'])
+        lexers = [get_lexer('/tmp/model_%d.py' % i) for i in range(50)]
+        assert isinstance(lexers[0], PythonLexer)
+        assert all(lexer is lexers[0] for lexer in lexers)
+        assert get_lexer(mimetype='text/x-python') is not None
+        assert get_lexer('data.unknown_extension') is None
+        assert len(scans) == 1
+    finally:
+        highlight.get_all_lexers = get_all_lexers
+        clear_lexer_cache()
+
+
+def test_lexer_extension_case():
+    clear_lexer_cache()
+    assert get_lexer('model.R').name == 'S'
+    assert get_lexer('model.r').name != 'S'
+    assert get_lexer('model.h').name == 'C'
+    clear_lexer_cache()
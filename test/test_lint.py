@@ -0,0 +1,29 @@
+from openalea.oalab.editor.lint import Diagnostic, lint, parse_flake8_output
+
+
+def test_parse_flake8_output():
+    output = """stdin:1:1: F401 'os' imported but unused
+stdin:3:80: E501 line too long (92 > 79 characters)
+stdin:4: W391 blank line at end of file
+some warning printed by a plugin
+"""
+    diagnostics = parse_flake8_output(output)
+    assert diagnostics == [
+        Diagnostic(1, 1, 'F401', "'os' imported but unused"),
+        Diagnostic(3, 80, 'E501', 'line too long (92 > 79 characters)'),
+        Diagnostic(4, 0, 'W391', 'blank line at end of file'),
+    ]
+    assert parse_flake8_output('') == []
+
+
+try:
+    import flake8
+except ImportError:
+    pass
+else:
+    def test_lint():
+        diagnostics = lint("import os\n")
+        assert len(diagnostics) == 1
+        assert diagnostics[0].line == 1
+        assert 'os' in diagnostics[0].message
+        assert lint("import os\nos.getcwd()\n") == []
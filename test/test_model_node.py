@@ -0,0 +1,126 @@
+import unittest
+
+import openalea.core.service.run
+from openalea.oalab.model import visualea
+from openalea.oalab.model.visualea import ModelNodeFactory, invalidate_model
+from openalea.oalab.service.model_change import model_changed
+
+
+class FakeModel(object):
+
+    inputs_info = []
+    outputs_info = []
+
+    def __init__(self, name, result=0):
+        self.name = name
+        self.result = result
+        self.received = []
+
+    def get_documentation(self):
+        return self.name
+
+    def __call__(self, *args, **kwargs):
+        # Like models, fill namespace with outputs
+        namespace = kwargs.get('namespace', {})
+        namespace['result'] = self.result
+        self.received.append(namespace)
+        return self.result
+
+
+class FakeProject(object):
+
+    def __init__(self, **models):
+        self.model = models
+
+
+class TestModelNode(unittest.TestCase):
+
+    def setUp(self):
+        invalidate_model()
+        self.lookups = []
+        self.namespaces = []
+        self.state = dict(project=None)
+        self._patched = [(visualea, '_lookup_model', self.lookup),
+                         (visualea, '_active_project', lambda: self.state['project']),
+                         (openalea.core.service.run, 'namespace', self.namespace)]
+        self._saved = [(obj, attr, getattr(obj, attr)) for obj, attr, value in self._patched]
+        for obj, attr, value in self._patched:
+            setattr(obj, attr, value)
+
+    def tearDown(self):
+        for obj, attr, value in self._saved:
+            setattr(obj, attr, value)
+        invalidate_model()
+
+    def lookup(self, name):
+        self.lookups.append(name)
+        return self.state['project'].model.get(name)
+
+    def namespace(self, model):
+        self.namespaces.append(model)
+        return {}
+
+    def test_resolve_once(self):
+        model = FakeModel('m')
+        self.state['project'] = FakeProject(m=model)
+
+        assert ModelNodeFactory('m').get_model() is model
+        assert ModelNodeFactory('m').get_model() is model
+        factory = ModelNodeFactory('m')
+        nodes = [factory.instantiate() for i in range(10)]
+        assert all(node.model is model for node in nodes)
+        assert self.lookups == ['m']
+
+    def test_invalidation(self):
+        project = self.state['project'] = FakeProject(m=FakeModel('m'))
+        factory = ModelNodeFactory('m')
+        factory.get_model()
+
+        # Code changed
+        model_changed('m.py')
+        factory.get_model()
+        assert self.lookups == ['m', 'm']
+
+        # Model reloaded in project
+        project.model['m'] = reloaded = FakeModel('m')
+        assert factory.get_model() is not reloaded
+        invalidate_model('m')
+        assert factory.get_model() is reloaded
+
+        # Project changed
+        other = FakeModel('m')
+        self.state['project'] = FakeProject(m=other)
+        assert factory.get_model() is other
+
+    def test_node_call(self):
+        project = self.state['project'] = FakeProject(m=FakeModel('m', 1))
+
+        node = ModelNodeFactory('m').instantiate()
+        other = ModelNodeFactory('m').instantiate()
+        assert node(()) == 1
+        assert node(()) == 1
+        assert other(()) == 1
+        # Model is resolved and its namespace prepared once
+        assert len(self.namespaces) == 1
+        assert self.lookups == ['m']
+
+        # Model changed
+        project.model['m'] = FakeModel('m', 2)
+        model_changed('m')
+        assert node(()) == 2
+        assert len(self.namespaces) == 2
+
+        # Project changed
+        self.state['project'] = FakeProject(m=FakeModel('m', 3))
+        assert node(()) == 3
+        assert len(self.namespaces) == 3
+
+    def test_namespace_copy(self):
+        model = FakeModel('m')
+        self.state['project'] = FakeProject(m=model)
+        node = ModelNodeFactory('m').instantiate()
+        node(())
+        node(())
+        # Each call gets its own copy of prepared namespace
+        assert model.received[0] is not model.received[1]
+        assert visualea._namespaces.values()[0][2] == {}
@@ -39,3 +39,43 @@ def test_constructor():
     controller = PythonModelController(**kwds[3])
     assert controller._obj is data
     assert hasattr(controller.model, 'run')
+
+
+def test_apply_unchanged_code():
+    controller = PythonModelController(name='Model1', content="print('hello')")
+    calls = []
+    set_code = controller._obj.set_code
+
+    def counted_set_code(code):
+        calls.append(code)
+        set_code(code)
+    controller._obj.set_code = counted_set_code
+
+    controller.set_value("print('hello')\nprint('world')")
+    controller.set_value("print('hello')\nprint('world')")
+    assert len(calls) == 1
+    controller.set_value("print('world')")
+    assert len(calls) == 2
+
+
+def test_apply_code_changed_by_model():
+    controller = PythonModelController(name='Model1', content="print('hello')")
+    calls = []
+    set_code = controller._obj.set_code
+
+    def counted_set_code(code):
+        calls.append(code)
+        set_code(code)
+    controller._obj.set_code = counted_set_code
+
+    code = "print('hello')\nprint('world')"
+    controller.set_value(code)
+    assert controller.is_applied(code)
+
+    # code changed without controller, for example when project is reloaded
+    controller.model.set_code("print('reloaded')")
+    assert not controller.is_applied(code)
+
+    controller.set_value(code)
+    assert len(calls) == 3
+    assert controller.model.repr_code() == code
@@ -91,3 +91,32 @@ def todo_return_statement():
 def todo_indent():
     codestring = 'if True:\n  def f():\n    a=1.23'
     funcs = extract_functions(codestring)
+
+
+def test_parse_cache():
+    from openalea.oalab.model.parse import parse_model_code, parse_cache_info, clear_parse_cache
+    code = '''"""
+input = a:int=1
+output = b
+"""
+
+def step():
+    b = a + 1
+'''
+    clear_parse_cache()
+    parsed = parse_model_code(code)
+    for i in range(1000):
+        parse_functions(code)
+    info = parse_cache_info()
+    assert info['misses'] == 1
+    assert info['hits'] == 1000
+    assert parsed.step
+    assert not parsed.run
+    assert parsed.inputs[0].name == 'a'
+
+    # inputs are copied, cached value is not affected
+    parsed.inputs[0].name = 'x'
+    assert parse_model_code(code).inputs[0].name == 'a'
+
+    parse_functions(code + '\n')
+    assert parse_cache_info()['misses'] == 2
@@ -0,0 +1,35 @@
+from openalea.oalab.editor.search import compile_pattern, find_all, iter_matches, qt_offsets, replace_matches
+
+
+def test_find_all_options():
+    text = u"foo Foo food foo"
+    assert find_all(text, u"foo") == [(0, 3), (4, 7), (8, 11), (13, 16)]
+    assert find_all(text, u"foo", case_sensitive=True) == [(0, 3), (8, 11), (13, 16)]
+    assert find_all(text, u"foo", whole_word=True) == [(0, 3), (4, 7), (13, 16)]
+    assert find_all(text, u"foo", case_sensitive=True, whole_word=True) == [(0, 3), (13, 16)]
+    assert find_all(u"a.b axb", u"a.b") == [(0, 3)]
+    assert find_all(u"a.b axb", u"a.b", regex=True) == [(0, 3), (4, 7)]
+    # empty matches are ignored
+    assert find_all(u"aaa", u"x*", regex=True) == []
+
+
+def test_replace_matches():
+    text = u"x a1 b22 c"
+    regexp = compile_pattern(u"([a-z])(\\d+)", regex=True)
+    matches = list(iter_matches(regexp, text))
+    start, end, new = replace_matches(text, matches, u"\\2\\1", expand=True)
+    assert text[:start] + new + text[end:] == u"x 1a 22b c"
+
+    start, end, new = replace_matches(text, matches, u"\\2")
+    assert text[:start] + new + text[end:] == u"x \\2 \\2 c"
+
+    assert replace_matches(text, [], u"y") == (0, 0, u"")
+
+
+def test_qt_offsets():
+    text = u"\U0001F600 foo \u00e9\U0001F600 foo"
+    offsets = [pos for span in find_all(text, u"foo") for pos in span]
+    # QTextDocument positions are UTF-16 code units
+    expected = [len(text[:pos].encode('utf-16-le')) // 2 for pos in offsets]
+    assert qt_offsets(text, offsets) == expected
+    assert qt_offsets(u"foo foo", [0, 3, 4, 7]) == [0, 3, 4, 7]
@@ -0,0 +1,69 @@
+import json
+
+from openalea.core.compositenode import CompositeNodeFactory
+from openalea.core.interface import IInt
+from openalea.oalab.model.parse import InputObj
+from openalea.oalab.model.visualea import VisualeaModel
+from openalea.oalab.model.visualea_json import factory_from_json, factory_to_json, is_json, _decode, _encode
+
+
+def test_encode_decode():
+    data = {
+        0: ('openalea.data structure', 'int'),
+        'data': {'caption': 'a', 'port_hide_changed': set([1])},
+        'position': [10.5, -3],
+        'none': None,
+    }
+    assert _decode(json.loads(json.dumps(_encode(data)))) == data
+
+
+def test_factory_round_trip():
+    cnf = CompositeNodeFactory('wf',
+                               inputs=[dict(name='a', interface=None, value=1)],
+                               elt_factory={2: ('openalea.math', '+')},
+                               elt_connections={0: (0, 0, 2, 0)},
+                               elt_data={2: {'caption': '+', 'lazy': True}},
+                               elt_value={2: [(1, '10')]},
+                               elt_ad_hoc={2: {'position': [1, 2]}})
+    code = factory_to_json(cnf)
+    assert is_json(code)
+    assert not is_json("CompositeNodeFactory(name='wf')")
+
+    loaded = factory_from_json(code)
+    assert loaded.safe_values
+    assert loaded.name == 'wf'
+    assert loaded.elt_factory == cnf.elt_factory
+    assert loaded.elt_connections == cnf.elt_connections
+    assert loaded.elt_value == cnf.elt_value
+    assert loaded.elt_ad_hoc == cnf.elt_ad_hoc
+
+
+def test_encode_interfaces():
+    assert _decode(json.loads(json.dumps(_encode(IInt)))) is IInt
+    interface = _decode(json.loads(json.dumps(_encode(IInt(min=2, max=5)))))
+    assert isinstance(interface, IInt)
+    assert (interface.min, interface.max) == (2, 5)
+
+    try:
+        _encode(object())
+    except ValueError:
+        pass
+    else:
+        assert False, 'ValueError not raised'
+
+
+def test_model_round_trip():
+    model = VisualeaModel(name='wf')
+    model.inputs_info = [InputObj('a:int=1'), InputObj('b')]
+    assert not is_json(model.repr_code())
+
+    model.save_format = 'json'
+    code = model.repr_code()
+    assert is_json(code)
+
+    loaded = VisualeaModel(name='wf')
+    loaded.set_code(code)
+    assert [inp.name for inp in loaded.inputs_info] == ['a', 'b']
+    assert loaded.inputs_info[0].default == 1
+    loaded.save_format = 'json'
+    assert loaded.repr_code() == code
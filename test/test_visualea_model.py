@@ -0,0 +1,58 @@
+from openalea.core.compositenode import CompositeNodeFactory
+from openalea.oalab.model.parse import InputObj, OutputObj
+from openalea.oalab.model.visualea import VisualeaModel, monkey_patch_instantiate_node
+
+
+def names(infos):
+    return [info.name for info in infos]
+
+
+def test_ports_info_cache():
+    model = VisualeaModel(name='wf')
+    model.inputs_info = [InputObj('a:int=1')]
+    model.outputs_info = [OutputObj('out')]
+    assert names(model.inputs_info) == ['a']
+    assert names(model.outputs_info) == ['out']
+
+    # Returned descriptors can be modified without altering model
+    inputs = model.inputs_info
+    inputs[0].name = 'changed'
+    inputs.append(InputObj('x'))
+    assert names(model.inputs_info) == ['a']
+
+    # Port added
+    model._workflow.add_input(name='b')
+    assert names(model.inputs_info) == ['a', 'b']
+
+    # Port removed
+    model.inputs_info = [InputObj('b')]
+    assert names(model.inputs_info) == ['b']
+
+    # Port renamed, same number of ports
+    model._workflow.clear_inputs()
+    model._workflow.add_input(name='c')
+    assert names(model.inputs_info) == ['c']
+
+    model._workflow.clear_outputs()
+    model._workflow.add_output(name='result')
+    assert names(model.outputs_info) == ['result']
+
+
+def test_set_code():
+    model = VisualeaModel(name='wf')
+    model.inputs_info = [InputObj('a')]
+    code = model.repr_code()
+
+    # code generated from current workflow (editor applied): workflow is kept
+    workflow = model._workflow
+    model.set_code(code)
+    assert model._workflow is workflow
+
+    # workflow changed since code was generated: code is loaded
+    workflow.add_input(name='b')
+    model.set_code(code)
+    assert model._workflow is not workflow
+    assert names(model.inputs_info) == ['a']
+
+    # core factories are not patched
+    assert CompositeNodeFactory.__dict__['instantiate_node'] is not monkey_patch_instantiate_node